@@ -6,10 +6,11 @@ Creates perfect JSON blueprints using intelligent query analysis and smart conte
 
 import logging
 import json
+import re
 import uuid
 import time
 from typing import Dict, List, Any, Optional
-from dataclasses import dataclass
+from dataclasses import dataclass, asdict
 import sys
 import os
 
@@ -24,6 +25,9 @@ from intelligent_flow_engine import IntelligentFlowEngine
 
 logger = logging.getLogger(__name__)
 
+# Word tokenizer for fallback keyword extraction (skips punctuation)
+_WORD_RE = re.compile(r"[A-Za-z0-9_]+")
+
 @dataclass
 class BlueprintMetadata:
     """Metadata about the generated blueprint"""
@@ -41,7 +45,55 @@ class EnhancedBlueprintGenerator:
     Enhanced blueprint generator that creates perfect JSON blueprints
     using intelligent analysis and smart content selection
     """
-    
+
+    # Integration-pattern templates, built once at class scope and returned
+    # by reference (tuples keep the component lists immutable)
+    _TEMPLATES = {
+        'sync': {
+            'pattern': 'sync',
+            'required_components': ('enricher', 'script', 'request_reply'),
+            'optional_components': ('filter', 'message_mapping'),
+            'flow_type': 'linear',
+            'error_handling': 'basic'
+        },
+        'batch': {
+            'pattern': 'batch',
+            'required_components': ('enricher', 'script', 'sftp'),
+            'optional_components': ('filter', 'message_mapping', 'aggregator'),
+            'flow_type': 'batch_processing',
+            'error_handling': 'retry_mechanism'
+        },
+        'event_driven': {
+            'pattern': 'event_driven',
+            'required_components': ('enricher', 'gateway', 'script'),
+            'optional_components': ('filter', 'request_reply'),
+            'flow_type': 'conditional',
+            'error_handling': 'notification'
+        },
+        'api_gateway': {
+            'pattern': 'api_gateway',
+            'required_components': ('enricher', 'gateway', 'request_reply'),
+            'optional_components': ('script', 'filter'),
+            'flow_type': 'routing',
+            'error_handling': 'exception_handling'
+        }
+    }
+
+    # file_type -> (asset bucket, purpose key, purpose default, static fields)
+    # for O(1) asset categorization instead of an if/elif chain
+    _FILE_TYPE_ROUTES = {
+        'groovy': ('groovy_scripts', 'gpt_script_purpose', 'Data processing',
+                   {'script_type': 'processing'}),
+        'gsh': ('groovy_scripts', 'gpt_script_purpose', 'Data processing',
+                {'script_type': 'processing'}),
+        'mmap': ('message_mappings', 'gpt_mapping_purpose', 'Data transformation', {}),
+        'wsdl': ('wsdl_files', 'gpt_service_purpose', 'Service definition', {}),
+        'properties': ('configuration_files', 'gpt_config_purpose', 'Configuration',
+                       {'config_type': 'parameters'}),
+        'prop': ('configuration_files', 'gpt_config_purpose', 'Configuration',
+                 {'config_type': 'parameters'})
+    }
+
     def __init__(self):
         """Initialize the enhanced generator"""
         logger.info("Initializing Enhanced Blueprint Generator")
@@ -429,7 +481,7 @@ class EnhancedBlueprintGenerator:
         intelligent_analysis = selected_content.get('selection_metadata', {}).get('gpt_analysis', {})
         flow_design = self.flow_engine.design_intelligent_flow(
             selected_content['core_components'],
-            user_intent.__dict__,
+            asdict(user_intent),
             intelligent_analysis
         )
 
@@ -503,18 +555,12 @@ class EnhancedBlueprintGenerator:
             reverse=True
         )
 
-        # Create flow sequence
-        flow_sequence = []
-
-        # Add start event
-        flow_sequence.append('StartEvent_1')
-
-        # Add components in logical order
-        for i, component in enumerate(sorted_components):
-            component_id = component.get('component_id', f'Component_{i+1}')
-            flow_sequence.append(component_id)
-
-        # Add end event
+        # Create flow sequence: start event, components in logical order, end event
+        flow_sequence = ['StartEvent_1']
+        flow_sequence.extend(
+            component.get('component_id', f'Component_{i+1}')
+            for i, component in enumerate(sorted_components)
+        )
         flow_sequence.append('EndEvent_1')
 
         return flow_sequence
@@ -533,6 +579,7 @@ class EnhancedBlueprintGenerator:
         # Process GPT-selected supporting assets
         for asset in selected_content.get('supporting_assets', []):
             file_type = asset.get('file_type', '').lower()
+            usage_context = asset.get('gpt_usage_context', '')
 
             asset_info = {
                 'file_name': asset.get('file_name', 'unknown'),
@@ -541,34 +588,27 @@ class EnhancedBlueprintGenerator:
                 'relevance_score': asset.get('relevance_score', 0.0),
                 'source': 'gpt_intelligent_selection',
                 'gpt_selection_reason': asset.get('gpt_selection_reason', ''),
-                'gpt_usage_context': asset.get('gpt_usage_context', ''),
+                'gpt_usage_context': usage_context,
                 'gpt_priority': asset.get('gpt_priority', 'medium')
             }
 
-            # Categorize assets with GPT insights
-            if file_type in ['groovy', 'gsh']:
-                asset_info['script_type'] = 'processing'
-                asset_info['gpt_script_purpose'] = asset.get('gpt_usage_context', 'Data processing')
-                assets['groovy_scripts'].append(asset_info)
-            elif file_type == 'mmap':
-                asset_info['gpt_mapping_purpose'] = asset.get('gpt_usage_context', 'Data transformation')
-                assets['message_mappings'].append(asset_info)
-            elif file_type == 'wsdl':
-                asset_info['gpt_service_purpose'] = asset.get('gpt_usage_context', 'Service definition')
-                assets['wsdl_files'].append(asset_info)
-            elif file_type in ['properties', 'prop']:
-                asset_info['config_type'] = 'parameters'
-                asset_info['gpt_config_purpose'] = asset.get('gpt_usage_context', 'Configuration')
-                assets['configuration_files'].append(asset_info)
-            else:
+            # Categorize assets with GPT insights via the route table
+            route = self._FILE_TYPE_ROUTES.get(file_type)
+            if route is None:
                 assets['other_resources'].append(asset_info)
+            else:
+                bucket, purpose_key, purpose_default, static_fields = route
+                asset_info.update(static_fields)
+                asset_info[purpose_key] = usage_context or purpose_default
+                assets[bucket].append(asset_info)
 
         # Add GPT analysis metadata
+        selection_metadata = selected_content.get('selection_metadata') or {}
         assets['gpt_selection_metadata'] = {
             'total_assets_analyzed': len(selected_content.get('supporting_assets', [])),
-            'gpt_confidence': selected_content.get('selection_metadata', {}).get('selection_confidence', 0.8),
-            'selection_reasoning': selected_content.get('selection_metadata', {}).get('selection_reasoning', ''),
-            'asset_coverage_analysis': selected_content.get('selection_metadata', {}).get('coverage_analysis', {})
+            'gpt_confidence': selection_metadata.get('selection_confidence', 0.8),
+            'selection_reasoning': selection_metadata.get('selection_reasoning', ''),
+            'asset_coverage_analysis': selection_metadata.get('coverage_analysis', {})
         }
 
         return assets
@@ -578,23 +618,34 @@ class EnhancedBlueprintGenerator:
         """Generate comprehensive metadata about the blueprint"""
         processing_time = time.time() - start_time
 
+        # Bind the nested sections once instead of re-fetching them per field
+        core_components = selected_content.get('core_components') or ()
+        supporting_assets = selected_content.get('supporting_assets') or ()
+        selection_metadata = selected_content.get('selection_metadata') or {}
+
+        # Count essentials and collect types in one pass over the components
+        essential_count = 0
+        component_types = set()
+        for comp in core_components:
+            if comp.get('is_essential', False):
+                essential_count += 1
+            component_types.add(comp.get('activity_type', 'unknown'))
+
         return {
             'generation_timestamp': time.strftime('%Y-%m-%d %H:%M:%S'),
             'processing_time_seconds': round(processing_time, 2),
             'query_confidence': user_intent.confidence_score,
-            'selection_confidence': selected_content.get('selection_metadata', {}).get('selection_confidence', 0.0),
-            'total_components': len(selected_content.get('core_components', [])),
-            'total_assets': len(selected_content.get('supporting_assets', [])),
+            'selection_confidence': selection_metadata.get('selection_confidence', 0.0),
+            'total_components': len(core_components),
+            'total_assets': len(supporting_assets),
             'integration_pattern': user_intent.integration_type,
             'complexity_level': user_intent.complexity_level,
-            'essential_components': sum(1 for comp in selected_content.get('core_components', [])
-                                      if comp.get('is_essential', False)),
-            'component_types_covered': list(set(comp.get('activity_type', 'unknown')
-                                              for comp in selected_content.get('core_components', []))),
-            'asset_types_covered': list(set(asset.get('file_type', 'unknown')
-                                          for asset in selected_content.get('supporting_assets', []))),
-            'requirement_coverage': selected_content.get('selection_metadata', {}).get('coverage_analysis', {}),
-            'source_packages': [pkg.get('id') for pkg in selected_content.get('reference_packages', [])],
+            'essential_components': essential_count,
+            'component_types_covered': list(component_types),
+            'asset_types_covered': list({asset.get('file_type', 'unknown')
+                                         for asset in supporting_assets}),
+            'requirement_coverage': selection_metadata.get('coverage_analysis', {}),
+            'source_packages': [pkg.get('id') for pkg in selected_content.get('reference_packages') or ()],
             'generator_version': '2.0',
             'intelligence_level': 'enhanced'
         }
@@ -610,7 +661,7 @@ class EnhancedBlueprintGenerator:
             business_logic=[],
             error_handling=[],
             complexity_level='simple',
-            description_keywords=user_query.lower().split(),
+            description_keywords=[t.lower() for t in _WORD_RE.findall(user_query)],
             component_keywords=[],
             asset_keywords=[],
             flow_keywords=[],
@@ -622,6 +673,7 @@ class EnhancedBlueprintGenerator:
     def _create_fallback_blueprint(self, user_query: str, error_message: str) -> Dict[str, Any]:
         """Create fallback blueprint when generation fails"""
         package_id = f"fallback_{uuid.uuid4().hex[:8]}"
+        generated_timestamp = time.strftime('%Y-%m-%d %H:%M:%S')
 
         return {
             'package_info': {
@@ -629,7 +681,7 @@ class EnhancedBlueprintGenerator:
                 'package_name': 'fallback_integration',
                 'description': f"Fallback blueprint for: {user_query}",
                 'version': '1.0.0',
-                'generated_timestamp': time.strftime('%Y-%m-%d %H:%M:%S'),
+                'generated_timestamp': generated_timestamp,
                 'integration_type': 'sync',
                 'complexity_level': 'simple'
             },
@@ -657,7 +709,7 @@ class EnhancedBlueprintGenerator:
                 'other_resources': []
             },
             'generation_metadata': {
-                'generation_timestamp': time.strftime('%Y-%m-%d %H:%M:%S'),
+                'generation_timestamp': generated_timestamp,
                 'processing_time_seconds': 0.0,
                 'query_confidence': 0.1,
                 'selection_confidence': 0.0,
@@ -676,64 +728,28 @@ class EnhancedBlueprintGenerator:
     # Template methods for different integration patterns
     def _get_sync_template(self) -> Dict[str, Any]:
         """Get template for synchronous integration"""
-        return {
-            'pattern': 'sync',
-            'required_components': ['enricher', 'script', 'request_reply'],
-            'optional_components': ['filter', 'message_mapping'],
-            'flow_type': 'linear',
-            'error_handling': 'basic'
-        }
+        return self._TEMPLATES['sync']
 
     def _get_batch_template(self) -> Dict[str, Any]:
         """Get template for batch integration"""
-        return {
-            'pattern': 'batch',
-            'required_components': ['enricher', 'script', 'sftp'],
-            'optional_components': ['filter', 'message_mapping', 'aggregator'],
-            'flow_type': 'batch_processing',
-            'error_handling': 'retry_mechanism'
-        }
+        return self._TEMPLATES['batch']
 
     def _get_event_driven_template(self) -> Dict[str, Any]:
         """Get template for event-driven integration"""
-        return {
-            'pattern': 'event_driven',
-            'required_components': ['enricher', 'gateway', 'script'],
-            'optional_components': ['filter', 'request_reply'],
-            'flow_type': 'conditional',
-            'error_handling': 'notification'
-        }
+        return self._TEMPLATES['event_driven']
 
     def _get_api_gateway_template(self) -> Dict[str, Any]:
         """Get template for API gateway integration"""
-        return {
-            'pattern': 'api_gateway',
-            'required_components': ['enricher', 'gateway', 'request_reply'],
-            'optional_components': ['script', 'filter'],
-            'flow_type': 'routing',
-            'error_handling': 'exception_handling'
-        }
+        return self._TEMPLATES['api_gateway']
     
     def _extract_flow_keywords(self, user_query: str) -> List[str]:
         """Extract flow-specific keywords"""
-        keywords = []
         query_lower = user_query.lower()
-        
-        flow_keywords = ['flow', 'connection', 'sequence', 'process']
-        for keyword in flow_keywords:
-            if keyword in query_lower:
-                keywords.append(keyword)
-        
-        return keywords
-    
+        flow_keywords = ('flow', 'connection', 'sequence', 'process')
+        return [keyword for keyword in flow_keywords if keyword in query_lower]
+
     def _extract_package_keywords(self, user_query: str) -> List[str]:
         """Extract package-specific keywords"""
-        keywords = []
         query_lower = user_query.lower()
-        
-        package_keywords = ['package', 'integration', 'iflow', 'process']
-        for keyword in package_keywords:
-            if keyword in query_lower:
-                keywords.append(keyword)
-        
-        return keywords
+        package_keywords = ('package', 'integration', 'iflow', 'process')
+        return [keyword for keyword in package_keywords if keyword in query_lower]
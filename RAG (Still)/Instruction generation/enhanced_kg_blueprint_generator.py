@@ -6,10 +6,11 @@ Integrates Neo4j knowledge graph for superior component selection and flow optim
 
 import logging
 import json
+import re
 import uuid
 import time
 from typing import Dict, List, Any, Optional
-from dataclasses import dataclass
+from dataclasses import dataclass, asdict
 import sys
 import os
 
@@ -28,6 +29,9 @@ from config import KG_INTEGRATION_CONFIG
 
 logger = logging.getLogger(__name__)
 
+# Word tokenizer for fallback keyword extraction (skips punctuation)
+_WORD_RE = re.compile(r"[A-Za-z0-9_]+")
+
 @dataclass
 class EnhancedBlueprintMetadata:
     """Enhanced metadata about the generated blueprint with KG insights"""
@@ -47,7 +51,55 @@ class EnhancedKGBlueprintGenerator:
     Enhanced blueprint generator with Knowledge Graph integration
     Creates superior JSON blueprints using KG insights and optimal flow patterns
     """
-    
+
+    # Integration-pattern templates, built once at class scope and returned
+    # by reference (tuples keep the component lists immutable)
+    _TEMPLATES = {
+        'sync': {
+            'pattern': 'sync',
+            'required_components': ('enricher', 'script', 'request_reply'),
+            'optional_components': ('filter', 'message_mapping'),
+            'flow_type': 'linear',
+            'error_handling': 'basic'
+        },
+        'batch': {
+            'pattern': 'batch',
+            'required_components': ('enricher', 'script', 'sftp'),
+            'optional_components': ('filter', 'message_mapping', 'aggregator'),
+            'flow_type': 'batch_processing',
+            'error_handling': 'retry_mechanism'
+        },
+        'event_driven': {
+            'pattern': 'event_driven',
+            'required_components': ('enricher', 'gateway', 'script'),
+            'optional_components': ('filter', 'request_reply'),
+            'flow_type': 'conditional',
+            'error_handling': 'notification'
+        },
+        'api_gateway': {
+            'pattern': 'api_gateway',
+            'required_components': ('enricher', 'gateway', 'request_reply'),
+            'optional_components': ('script', 'filter'),
+            'flow_type': 'routing',
+            'error_handling': 'exception_handling'
+        }
+    }
+
+    # file_type -> (asset bucket, purpose key, purpose default, static fields)
+    # for O(1) asset categorization instead of an if/elif chain
+    _FILE_TYPE_ROUTES = {
+        'groovy': ('groovy_scripts', 'gpt_script_purpose', 'Data processing',
+                   {'script_type': 'processing'}),
+        'gsh': ('groovy_scripts', 'gpt_script_purpose', 'Data processing',
+                {'script_type': 'processing'}),
+        'mmap': ('message_mappings', 'gpt_mapping_purpose', 'Data transformation', {}),
+        'wsdl': ('wsdl_files', 'gpt_service_purpose', 'Service definition', {}),
+        'properties': ('configuration_files', 'gpt_config_purpose', 'Configuration',
+                       {'config_type': 'parameters'}),
+        'prop': ('configuration_files', 'gpt_config_purpose', 'Configuration',
+                 {'config_type': 'parameters'})
+    }
+
     def __init__(self):
         """Initialize the enhanced KG generator"""
         logger.info("Initializing Enhanced Knowledge Graph Blueprint Generator")
@@ -117,8 +169,9 @@ class EnhancedKGBlueprintGenerator:
                        f"{len(selected_content['supporting_assets'])} assets")
             
             # Step 4: Knowledge Graph flow optimization
+            # Skip entirely when nothing was selected - each KG call is a network round-trip
             kg_optimization = None
-            if self.kg_connector:
+            if self.kg_connector and selected_content.get('core_components'):
                 logger.info("Step 4: Applying Knowledge Graph flow optimization")
                 kg_optimization = self._apply_kg_flow_optimization(
                     selected_content, user_intent
@@ -145,27 +198,23 @@ class EnhancedKGBlueprintGenerator:
         """Apply Knowledge Graph flow optimization"""
         try:
             components = selected_content.get('core_components', [])
-            
-            # Get KG flow optimization
-            kg_optimization = self.kg_connector.generate_flow_optimization(components)
-            
-            # Get component recommendations from KG
-            component_types = [comp.get('activity_type', '') for comp in components]
-            kg_recommendations = self.kg_connector.get_component_recommendations(
-                component_types, user_intent.integration_type
+            if not components:
+                return {'optimization_score': 0.0}
+
+            # Fetch optimization, recommendations and pattern insights together
+            # Dedup types (order-preserving) - recommendations are per-type, not per-component
+            component_types = list(dict.fromkeys(
+                comp.get('activity_type', '') for comp in components
+                if comp.get('activity_type')
+            ))
+            kg_context = self.kg_connector.fetch_all_flow_context(
+                components, component_types, user_intent.integration_type
             )
-            
-            # Get integration pattern insights
-            pattern_insights = self.kg_connector.get_integration_pattern_insights(
-                user_intent.integration_type
+            kg_context['optimization_score'] = kg_context['flow_optimization'].get(
+                'optimization_score', 0.0
             )
-            
-            return {
-                'flow_optimization': kg_optimization,
-                'component_recommendations': kg_recommendations,
-                'pattern_insights': pattern_insights,
-                'optimization_score': kg_optimization.get('optimization_score', 0.0)
-            }
+
+            return kg_context
             
         except Exception as e:
             logger.error(f"Error applying KG flow optimization: {e}")
@@ -212,6 +261,12 @@ class EnhancedKGBlueprintGenerator:
                                        kg_optimization: Dict[str, Any] = None) -> Dict[str, Any]:
         """Generate intelligent blueprint with KG insights"""
         try:
+            # Unpack once and thread plain arguments to the sub-generators
+            core_components = selected_content.get('core_components') or ()
+            supporting_assets = selected_content.get('supporting_assets') or ()
+            selection_metadata = selected_content.get('selection_metadata', {})
+            reference_packages = selected_content.get('reference_packages') or ()
+
             # Get the appropriate template
             template = self.blueprint_templates.get(user_intent.integration_type,
                                                    self.blueprint_templates['sync'])
@@ -221,15 +276,18 @@ class EnhancedKGBlueprintGenerator:
 
             # Generate iFlow definition with KG-enhanced components
             iflow_definition = self._generate_kg_enhanced_iflow_definition(
-                selected_content, user_intent, kg_optimization
+                core_components, selection_metadata, user_intent, kg_optimization
             )
 
             # Generate package assets
-            package_assets = self._generate_package_assets(selected_content)
+            package_assets = self._generate_package_assets(
+                supporting_assets, selection_metadata
+            )
 
             # Generate enhanced metadata with KG insights
             generation_metadata = self._generate_enhanced_blueprint_metadata(
-                selected_content, user_intent, start_time, kg_optimization
+                core_components, supporting_assets, selection_metadata,
+                reference_packages, user_intent, start_time, kg_optimization
             )
 
             # Assemble final blueprint
@@ -254,7 +312,8 @@ class EnhancedKGBlueprintGenerator:
             logger.error(f"Error generating intelligent blueprint with KG: {e}")
             return self._create_fallback_blueprint(user_intent.original_query, str(e))
     
-    def _generate_kg_enhanced_iflow_definition(self, selected_content: Dict[str, Any],
+    def _generate_kg_enhanced_iflow_definition(self, core_components: List[Dict[str, Any]],
+                                              selection_metadata: Dict[str, Any],
                                               user_intent: UserIntent,
                                               kg_optimization: Dict[str, Any] = None) -> Dict[str, Any]:
         """Generate iFlow definition with KG-enhanced flow optimization"""
@@ -262,16 +321,16 @@ class EnhancedKGBlueprintGenerator:
         iflow_name = self._generate_package_name(user_intent)
 
         # Use intelligent flow engine to design optimal flow
-        intelligent_analysis = selected_content.get('selection_metadata', {}).get('gpt_analysis', {})
+        intelligent_analysis = selection_metadata.get('gpt_analysis', {})
         flow_design = self.flow_engine.design_intelligent_flow(
-            selected_content['core_components'],
-            user_intent.__dict__,
+            core_components,
+            asdict(user_intent),
             intelligent_analysis
         )
 
         # Generate BPMN structure from intelligent flow design
         bpmn_structure = self.flow_engine.generate_bpmn_structure(
-            flow_design, selected_content['core_components']
+            flow_design, core_components
         )
 
         # Enhance with KG flow sequence if available
@@ -326,22 +385,22 @@ class EnhancedKGBlueprintGenerator:
     
     def _generate_package_name(self, user_intent: UserIntent) -> str:
         """Generate meaningful package name"""
-        # Base name from integration type
-        base_name = user_intent.integration_type
+        # Collect parts and join once instead of repeated string concatenation
+        parts = [user_intent.integration_type]
 
         # Add system information
         if user_intent.source_systems:
-            base_name += f"_{user_intent.source_systems[0]}"
+            parts.append(user_intent.source_systems[0])
 
         # Add data type
         if user_intent.data_types:
-            base_name += f"_{user_intent.data_types[0]}"
+            parts.append(user_intent.data_types[0])
 
         # Add operation
         if user_intent.business_logic:
-            base_name += f"_{user_intent.business_logic[0]}"
+            parts.append(user_intent.business_logic[0])
 
-        return base_name.replace(' ', '_').lower()
+        return '_'.join(parts).replace(' ', '_').lower()
     
     def _generate_package_description(self, user_intent: UserIntent) -> str:
         """Generate meaningful package description"""
@@ -374,7 +433,8 @@ class EnhancedKGBlueprintGenerator:
 
         return description
     
-    def _generate_package_assets(self, selected_content: Dict[str, Any]) -> Dict[str, Any]:
+    def _generate_package_assets(self, supporting_assets: List[Dict[str, Any]],
+                                selection_metadata: Dict[str, Any]) -> Dict[str, Any]:
         """Generate package assets from GPT-selected content"""
         assets = {
             'bpmn_files': [],
@@ -386,8 +446,9 @@ class EnhancedKGBlueprintGenerator:
         }
 
         # Process GPT-selected supporting assets
-        for asset in selected_content.get('supporting_assets', []):
+        for asset in supporting_assets:
             file_type = asset.get('file_type', '').lower()
+            usage_context = asset.get('gpt_usage_context', '')
 
             asset_info = {
                 'file_name': asset.get('file_name', 'unknown'),
@@ -396,55 +457,58 @@ class EnhancedKGBlueprintGenerator:
                 'relevance_score': asset.get('relevance_score', 0.0),
                 'source': 'gpt_intelligent_selection',
                 'gpt_selection_reason': asset.get('gpt_selection_reason', ''),
-                'gpt_usage_context': asset.get('gpt_usage_context', ''),
+                'gpt_usage_context': usage_context,
                 'gpt_priority': asset.get('gpt_priority', 'medium'),
                 'kg_enhanced': True
             }
 
-            # Categorize assets with GPT insights
-            if file_type in ['groovy', 'gsh']:
-                asset_info['script_type'] = 'processing'
-                asset_info['gpt_script_purpose'] = asset.get('gpt_usage_context', 'Data processing')
-                assets['groovy_scripts'].append(asset_info)
-            elif file_type == 'mmap':
-                asset_info['gpt_mapping_purpose'] = asset.get('gpt_usage_context', 'Data transformation')
-                assets['message_mappings'].append(asset_info)
-            elif file_type == 'wsdl':
-                asset_info['gpt_service_purpose'] = asset.get('gpt_usage_context', 'Service definition')
-                assets['wsdl_files'].append(asset_info)
-            elif file_type in ['properties', 'prop']:
-                asset_info['config_type'] = 'parameters'
-                asset_info['gpt_config_purpose'] = asset.get('gpt_usage_context', 'Configuration')
-                assets['configuration_files'].append(asset_info)
-            else:
+            # Categorize assets with GPT insights via the route table
+            route = self._FILE_TYPE_ROUTES.get(file_type)
+            if route is None:
                 assets['other_resources'].append(asset_info)
+            else:
+                bucket, purpose_key, purpose_default, static_fields = route
+                asset_info.update(static_fields)
+                asset_info[purpose_key] = usage_context or purpose_default
+                assets[bucket].append(asset_info)
 
         # Add GPT analysis metadata
         assets['gpt_selection_metadata'] = {
-            'total_assets_analyzed': len(selected_content.get('supporting_assets', [])),
-            'gpt_confidence': selected_content.get('selection_metadata', {}).get('selection_confidence', 0.8),
-            'selection_reasoning': selected_content.get('selection_metadata', {}).get('selection_reasoning', ''),
-            'asset_coverage_analysis': selected_content.get('selection_metadata', {}).get('coverage_analysis', {}),
+            'total_assets_analyzed': len(supporting_assets),
+            'gpt_confidence': selection_metadata.get('selection_confidence', 0.8),
+            'selection_reasoning': selection_metadata.get('selection_reasoning', ''),
+            'asset_coverage_analysis': selection_metadata.get('coverage_analysis', {}),
             'kg_enhanced': True
         }
 
         return assets
     
-    def _generate_enhanced_blueprint_metadata(self, selected_content: Dict[str, Any],
+    def _generate_enhanced_blueprint_metadata(self, core_components: List[Dict[str, Any]],
+                                            supporting_assets: List[Dict[str, Any]],
+                                            selection_metadata: Dict[str, Any],
+                                            reference_packages: List[Dict[str, Any]],
                                             user_intent: UserIntent, start_time: float,
                                             kg_optimization: Dict[str, Any] = None) -> Dict[str, Any]:
         """Generate comprehensive metadata about the blueprint with KG insights"""
         processing_time = time.time() - start_time
 
+        # Count essentials and collect component types in a single pass
+        essential_count = 0
+        component_types = set()
+        for comp in core_components:
+            if comp.get('is_essential', False):
+                essential_count += 1
+            component_types.add(comp.get('activity_type', 'unknown'))
+
         # Extract KG insights
         kg_insights = {}
         kg_optimization_score = 0.0
-        
+
         if kg_optimization:
             kg_optimization_score = kg_optimization.get('optimization_score', 0.0)
             kg_insights = {
                 'flow_optimization': kg_optimization.get('flow_optimization', {}),
-                'component_recommendations': len(kg_optimization.get('component_recommendations', [])),
+                'component_recommendations': len(kg_optimization.get('component_recommendations') or ()),
                 'pattern_insights': kg_optimization.get('pattern_insights', {}),
                 'kg_enhanced': True
             }
@@ -453,20 +517,18 @@ class EnhancedKGBlueprintGenerator:
             'generation_timestamp': time.strftime('%Y-%m-%d %H:%M:%S'),
             'processing_time_seconds': round(processing_time, 2),
             'query_confidence': user_intent.confidence_score,
-            'selection_confidence': selected_content.get('selection_metadata', {}).get('selection_confidence', 0.0),
+            'selection_confidence': selection_metadata.get('selection_confidence', 0.0),
             'kg_optimization_score': kg_optimization_score,
-            'total_components': len(selected_content.get('core_components', [])),
-            'total_assets': len(selected_content.get('supporting_assets', [])),
+            'total_components': len(core_components),
+            'total_assets': len(supporting_assets),
             'integration_pattern': user_intent.integration_type,
             'complexity_level': user_intent.complexity_level,
-            'essential_components': sum(1 for comp in selected_content.get('core_components', [])
-                                      if comp.get('is_essential', False)),
-            'component_types_covered': list(set(comp.get('activity_type', 'unknown')
-                                              for comp in selected_content.get('core_components', []))),
-            'asset_types_covered': list(set(asset.get('file_type', 'unknown')
-                                          for asset in selected_content.get('supporting_assets', []))),
-            'requirement_coverage': selected_content.get('selection_metadata', {}).get('coverage_analysis', {}),
-            'source_packages': [pkg.get('id') for pkg in selected_content.get('reference_packages', [])],
+            'essential_components': essential_count,
+            'component_types_covered': list(component_types),
+            'asset_types_covered': list({asset.get('file_type', 'unknown')
+                                         for asset in supporting_assets}),
+            'requirement_coverage': selection_metadata.get('coverage_analysis', {}),
+            'source_packages': [pkg.get('id') for pkg in reference_packages],
             'generator_version': '3.0',
             'intelligence_level': 'enhanced_kg',
             'kg_insights': kg_insights
@@ -483,7 +545,7 @@ class EnhancedKGBlueprintGenerator:
             business_logic=[],
             error_handling=[],
             complexity_level='simple',
-            description_keywords=user_query.lower().split(),
+            description_keywords=[t.lower() for t in _WORD_RE.findall(user_query)],
             component_keywords=[],
             asset_keywords=[],
             flow_keywords=[],
@@ -495,6 +557,7 @@ class EnhancedKGBlueprintGenerator:
     def _create_fallback_blueprint(self, user_query: str, error_message: str) -> Dict[str, Any]:
         """Create fallback blueprint when generation fails"""
         package_id = f"fallback_{uuid.uuid4().hex[:8]}"
+        generated_timestamp = time.strftime('%Y-%m-%d %H:%M:%S')
 
         return {
             'package_info': {
@@ -502,7 +565,7 @@ class EnhancedKGBlueprintGenerator:
                 'package_name': 'fallback_integration',
                 'description': f"Fallback blueprint for: {user_query}",
                 'version': '1.0.0',
-                'generated_timestamp': time.strftime('%Y-%m-%d %H:%M:%S'),
+                'generated_timestamp': generated_timestamp,
                 'integration_type': 'sync',
                 'complexity_level': 'simple',
                 'kg_enhanced': False
@@ -532,7 +595,7 @@ class EnhancedKGBlueprintGenerator:
                 'other_resources': []
             },
             'generation_metadata': {
-                'generation_timestamp': time.strftime('%Y-%m-%d %H:%M:%S'),
+                'generation_timestamp': generated_timestamp,
                 'processing_time_seconds': 0.0,
                 'query_confidence': 0.1,
                 'selection_confidence': 0.0,
@@ -558,43 +621,19 @@ class EnhancedKGBlueprintGenerator:
     # Template methods for different integration patterns
     def _get_sync_template(self) -> Dict[str, Any]:
         """Get template for synchronous integration"""
-        return {
-            'pattern': 'sync',
-            'required_components': ['enricher', 'script', 'request_reply'],
-            'optional_components': ['filter', 'message_mapping'],
-            'flow_type': 'linear',
-            'error_handling': 'basic'
-        }
+        return self._TEMPLATES['sync']
 
     def _get_batch_template(self) -> Dict[str, Any]:
         """Get template for batch integration"""
-        return {
-            'pattern': 'batch',
-            'required_components': ['enricher', 'script', 'sftp'],
-            'optional_components': ['filter', 'message_mapping', 'aggregator'],
-            'flow_type': 'batch_processing',
-            'error_handling': 'retry_mechanism'
-        }
+        return self._TEMPLATES['batch']
 
     def _get_event_driven_template(self) -> Dict[str, Any]:
         """Get template for event-driven integration"""
-        return {
-            'pattern': 'event_driven',
-            'required_components': ['enricher', 'gateway', 'script'],
-            'optional_components': ['filter', 'request_reply'],
-            'flow_type': 'conditional',
-            'error_handling': 'notification'
-        }
+        return self._TEMPLATES['event_driven']
 
     def _get_api_gateway_template(self) -> Dict[str, Any]:
         """Get template for API gateway integration"""
-        return {
-            'pattern': 'api_gateway',
-            'required_components': ['enricher', 'gateway', 'request_reply'],
-            'optional_components': ['script', 'filter'],
-            'flow_type': 'routing',
-            'error_handling': 'exception_handling'
-        }
+        return self._TEMPLATES['api_gateway']
 
 def main():
     """Test the Enhanced KG Blueprint Generator"""
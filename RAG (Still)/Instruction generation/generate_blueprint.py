@@ -6,8 +6,9 @@ Generate JSON blueprints from natural language queries
 
 import sys
 import os
-import json
 import logging
+
+import orjson
 from pathlib import Path
 from datetime import datetime
 
@@ -50,10 +51,10 @@ def generate_single_blueprint(query: str, output_file: str = None):
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             output_file = f"blueprint_{timestamp}.json"
 
-        # Save to Output json folder
+        # Save to Output json folder (orjson writes UTF-8 bytes directly)
         output_path = output_dir / output_file
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(blueprint, f, indent=2, ensure_ascii=False)
+        with open(output_path, 'wb') as f:
+            f.write(orjson.dumps(blueprint, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
         
         print("✅ Blueprint generated successfully!")
         print(f"📁 Saved to: {output_path.absolute()}")
@@ -132,8 +133,8 @@ def interactive_mode():
                 filename = f"blueprint_{query_count + 1}_{timestamp}.json"
                 output_path = output_dir / filename
 
-                with open(output_path, 'w', encoding='utf-8') as f:
-                    json.dump(blueprint, f, indent=2, ensure_ascii=False)
+                with open(output_path, 'wb') as f:
+                    f.write(orjson.dumps(blueprint, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
 
                 print(f"✅ Blueprint saved to: {output_path}")
                 print_blueprint_summary(blueprint)
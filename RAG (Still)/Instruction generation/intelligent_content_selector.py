@@ -4,12 +4,22 @@ GPT-5 Powered Intelligent Content Selector
 Uses GPT-5 for smart component selection and intelligent flow design
 """
 
+import copy
+import hashlib
+import heapq
 import logging
 import json
+import re
 import sys
 import os
 from typing import Dict, List, Any, Optional, Tuple
 from dataclasses import dataclass
+from functools import cached_property
+from itertools import islice
+from operator import attrgetter, itemgetter
+from types import MappingProxyType
+
+import orjson
 from openai import OpenAI
 
 # Add current directory to path
@@ -19,17 +29,150 @@ from knowledge_graph_connector import KnowledgeGraphConnector
 
 logger = logging.getLogger(__name__)
 
-@dataclass
+# Component priority levels as small ints for cheap comparison
+PRIORITY_LOW, PRIORITY_MEDIUM, PRIORITY_HIGH = 0, 1, 2
+
+def _trunc(s: str, n: int) -> str:
+    """Bounded truncation that avoids copying already-short strings"""
+    return s if len(s) <= n else s[:n]
+
+# Defaults merged into each record before a single itemgetter extraction,
+# replacing a string of per-key .get calls in the summary builders
+_COMP_DEFAULTS = {'component_id': '', 'activity_type': 'unknown', 'description': '',
+                  'properties': {}, 'complete_bpmn_xml': '', 'related_scripts': ()}
+_COMP_FIELDS = itemgetter('component_id', 'activity_type', 'description',
+                          'properties', 'complete_bpmn_xml', 'related_scripts')
+_ASSET_DEFAULTS = {'file_name': '', 'file_type': 'unknown', 'description': '', 'content': ''}
+_ASSET_FIELDS = itemgetter('file_name', 'file_type', 'description', 'content')
+
+def _to_columns(records: List[Dict[str, Any]]) -> Dict[str, List[Any]]:
+    """Transpose a list of uniform dicts to columns, shrinking prompt JSON"""
+    if not records:
+        return {}
+    return {k: [r[k] for r in records] for k in records[0]}
+
+# All BPMN quality indicators in one compiled alternation so each XML is
+# scanned once instead of once per indicator (longest patterns first)
+_BPMN_QUALITY_RE = re.compile(
+    'extensionElements|BPMNShape|BPMNEdge|property|incoming|outgoing')
+
+def _keyword_pattern(keywords) -> Optional['re.Pattern']:
+    """Compile keywords into one lowercase alternation (longest first)"""
+    kws = sorted({kw.lower() for kw in keywords if kw}, key=len, reverse=True)
+    if not kws:
+        return None
+    return re.compile('|'.join(re.escape(kw) for kw in kws))
+
+class _IntentMatcher:
+    """Precompiled multi-keyword matchers for one user intent.
+
+    Regex alternations scan each text once per category instead of once
+    per keyword, replacing the nested substring loops in the scorers.
+    """
+    __slots__ = ('systems_re', 'data_types_re', 'logic_re',
+                 'description_re', 'asset_kw_re',
+                 'integration_type_lc', 'required_components_lc')
+
+    def __init__(self, user_intent: 'UserIntent'):
+        self.systems_re = _keyword_pattern(
+            user_intent.source_systems + user_intent.target_systems)
+        self.data_types_re = _keyword_pattern(user_intent.data_types)
+        self.logic_re = _keyword_pattern(user_intent.business_logic)
+        self.description_re = _keyword_pattern(
+            kw for kw in user_intent.description_keywords if len(kw) > 3)
+        self.asset_kw_re = _keyword_pattern(user_intent.asset_keywords)
+        # Pre-lowered scalars reused across every scored component
+        self.integration_type_lc = user_intent.integration_type.lower()
+        self.required_components_lc = tuple(
+            rc.lower() for rc in getattr(user_intent, 'required_components', None) or ())
+
+# Analysis prompt built once at import; filled per call with str.format.
+# Component/asset payloads are compact JSON to keep the token count down.
+_ANALYSIS_PROMPT_TMPL = """
+You are an expert SAP Integration Suite architect with deep knowledge of iFlow design patterns and component relationships.
+
+TASK: Analyze the retrieved components and assets, then provide intelligent recommendations for optimal selection and flow design.
+
+USER REQUIREMENTS:
+- Integration Type: {integration_type}
+- Source Systems: {source_systems}
+- Target Systems: {target_systems}
+- Data Types: {data_types}
+- Required Operations: {business_logic}
+- Original Query: "{original_query}"
+
+AVAILABLE COMPONENTS (column-oriented JSON: entry N of each list describes component N):
+{components_json}
+
+AVAILABLE ASSETS (column-oriented JSON: entry N of each list describes asset N):
+{assets_json}
+
+Please provide a comprehensive analysis and recommendations in JSON format:
+
+{{
+    "component_recommendations": [
+        {{
+            "component_index": 0,
+            "selection_reason": "Why this component is essential/recommended",
+            "priority": "essential|high|medium|low",
+            "role_in_flow": "What role this component plays",
+            "configuration_notes": "Key configuration considerations"
+        }}
+    ],
+    "asset_recommendations": [
+        {{
+            "asset_index": 0,
+            "selection_reason": "Why this asset is needed",
+            "priority": "essential|high|medium|low",
+            "usage_context": "How this asset will be used"
+        }}
+    ],
+    "flow_design": {{
+        "flow_pattern": "Description of the optimal flow pattern",
+        "component_sequence": ["List of component IDs in execution order"],
+        "connection_logic": {{
+            "linear_connections": [["source_id", "target_id"]],
+            "conditional_connections": [
+                {{
+                    "source_id": "gateway_id",
+                    "conditions": [
+                        {{"condition": "success", "target_id": "next_component"}},
+                        {{"condition": "error", "target_id": "error_handler"}}
+                    ]
+                }}
+            ]
+        }},
+        "error_handling_strategy": "How errors should be handled",
+        "performance_considerations": "Performance optimization notes"
+    }},
+    "selection_reasoning": "Overall reasoning for the selections made",
+    "confidence_score": 0.0-1.0,
+    "integration_completeness": "Assessment of how well the selection meets requirements",
+    "potential_gaps": ["Any missing components or capabilities"],
+    "optimization_suggestions": ["Ways to improve the integration"]
+}}
+
+Focus on:
+1. Selecting components that work well together
+2. Ensuring proper data flow and transformation
+3. Including appropriate error handling
+4. Optimizing for the specific integration pattern
+5. Considering system compatibility and performance
+
+Provide only the JSON response, no additional text.
+"""
+
+@dataclass(slots=True)
 class ComponentScore:
     """Component with calculated relevance score"""
     component: Dict[str, Any]
     relevance_score: float
     match_reasons: List[str]
-    priority_level: str  # high, medium, low
+    priority_level: int  # PRIORITY_HIGH / PRIORITY_MEDIUM / PRIORITY_LOW
     component_type: str
     is_essential: bool
 
-@dataclass
+@dataclass(slots=True)
 class UserIntent:
     """User intent structure"""
     integration_type: str
@@ -53,63 +196,129 @@ class GPTPoweredContentSelector:
     GPT-5 powered intelligent content selector for optimal component selection
     """
 
+    # Component priority mapping based on integration patterns, shared
+    # across instances (frozensets make membership checks O(1); the
+    # proxy keeps the shared table read-only)
+    _COMPONENT_PRIORITIES = MappingProxyType({
+        'sync': {
+            'essential': frozenset({'enricher', 'script', 'request_reply'}),
+            'recommended': frozenset({'filter', 'message_mapping'}),
+            'optional': frozenset({'gateway', 'aggregator'})
+        },
+        'batch': {
+            'essential': frozenset({'enricher', 'script', 'sftp'}),
+            'recommended': frozenset({'filter', 'message_mapping', 'aggregator'}),
+            'optional': frozenset({'gateway', 'splitter'})
+        },
+        'event_driven': {
+            'essential': frozenset({'enricher', 'gateway', 'script'}),
+            'recommended': frozenset({'filter', 'request_reply'}),
+            'optional': frozenset({'message_mapping', 'aggregator'})
+        },
+        'api_gateway': {
+            'essential': frozenset({'enricher', 'gateway', 'request_reply'}),
+            'recommended': frozenset({'script', 'filter'}),
+            'optional': frozenset({'message_mapping'})
+        }
+    })
+
+    # Flattened priority index: integration_type -> ((keyword, (priority,
+    # is_essential)), ...) with essential entries first, so priority lookup
+    # is one flat scan instead of two tier loops
+    _PRIORITY_INDEX = {}
+    for _itype, _tiers in _COMPONENT_PRIORITIES.items():
+        _PRIORITY_INDEX[_itype] = tuple(
+            [(kw, (PRIORITY_HIGH, True)) for kw in _tiers['essential']]
+            + [(kw, (PRIORITY_MEDIUM, False)) for kw in _tiers['recommended']]
+        )
+    del _itype, _tiers
+
+    # Component type scoring weights
+    _COMPONENT_WEIGHTS = MappingProxyType({
+        'activity_type_match': 0.4,
+        'description_relevance': 0.25,
+        'bpmn_xml_quality': 0.15,
+        'system_integration': 0.1,
+        'business_logic_match': 0.1
+    })
+    # Fixed evaluation order of the weights above, unpacked to locals in
+    # the scoring hot loop instead of five dict lookups per component
+    _WEIGHT_VALUES = (
+        _COMPONENT_WEIGHTS['activity_type_match'],
+        _COMPONENT_WEIGHTS['description_relevance'],
+        _COMPONENT_WEIGHTS['bpmn_xml_quality'],
+        _COMPONENT_WEIGHTS['system_integration'],
+        _COMPONENT_WEIGHTS['business_logic_match'],
+    )
+
+    # Asset type priorities
+    _ASSET_PRIORITIES = MappingProxyType({
+        'groovy': 0.4,  # Scripts are highly valuable
+        'mmap': 0.3,    # Message mappings
+        'wsdl': 0.2,    # Service definitions
+        'xsd': 0.1      # Schemas
+    })
+
+    # Maximum number of memoized selections kept per instance
+    _SELECTION_CACHE_SIZE = 128
+
+    # Top-K kept after scoring: roughly 2x what the selection passes
+    # consume, so the re-ranking by priority still has slack
+    _MAX_SCORED_COMPONENTS = 30
+    _MAX_SCORED_ASSETS = 20
+
+    # KG init outcome shared across instances: None = untried,
+    # False = disabled or failed, otherwise the connector
+    _kg_init_cache = None
+
     def __init__(self):
         """Initialize the GPT-powered content selector"""
-        self.openai_client = OpenAI(api_key=OPENAI_CONFIG['api_key'])
-        
-        # Initialize Knowledge Graph Connector if enabled
-        self.kg_connector = None
-        if KG_INTEGRATION_CONFIG.get('enabled', False):
-            try:
-                self.kg_connector = KnowledgeGraphConnector()
-                logger.info("Knowledge Graph Connector initialized successfully")
-            except Exception as e:
-                logger.warning(f"Failed to initialize Knowledge Graph Connector: {e}")
-                self.kg_connector = None
-
-        # Component priority mapping based on integration patterns
-        self.component_priorities = {
-            'sync': {
-                'essential': ['enricher', 'script', 'request_reply'],
-                'recommended': ['filter', 'message_mapping'],
-                'optional': ['gateway', 'aggregator']
-            },
-            'batch': {
-                'essential': ['enricher', 'script', 'sftp'],
-                'recommended': ['filter', 'message_mapping', 'aggregator'],
-                'optional': ['gateway', 'splitter']
-            },
-            'event_driven': {
-                'essential': ['enricher', 'gateway', 'script'],
-                'recommended': ['filter', 'request_reply'],
-                'optional': ['message_mapping', 'aggregator']
-            },
-            'api_gateway': {
-                'essential': ['enricher', 'gateway', 'request_reply'],
-                'recommended': ['script', 'filter'],
-                'optional': ['message_mapping']
-            }
-        }
-        
-        # Component type scoring weights
-        self.component_weights = {
-            'activity_type_match': 0.4,
-            'description_relevance': 0.25,
-            'bpmn_xml_quality': 0.15,
-            'system_integration': 0.1,
-            'business_logic_match': 0.1
-        }
-        
-        # Asset type priorities
-        self.asset_priorities = {
-            'groovy': 0.4,  # Scripts are highly valuable
-            'mmap': 0.3,    # Message mappings
-            'wsdl': 0.2,    # Service definitions
-            'xsd': 0.1      # Schemas
-        }
-        
+        # openai_client and kg_connector are cached_property instances,
+        # created lazily on first access; the priority/weight tables are
+        # class-level constants
+        self._selection_cache: Dict[Tuple, Dict[str, Any]] = {}
+        self._gpt_analysis_cache: Dict[bytes, Dict[str, Any]] = {}
+        self._intent_matcher_cache: Tuple[Optional[UserIntent], Optional[_IntentMatcher]] = (None, None)
         logger.info("GPT-Powered Content Selector initialized")
 
+    def _get_intent_matcher(self, user_intent: UserIntent) -> _IntentMatcher:
+        """Build (or reuse) the compiled keyword matchers for this intent.
+
+        The cache holds the intent itself and compares identity: keeping the
+        reference alive guarantees a freed intent's address can't be reused
+        by a new one and silently match a stale entry.
+        """
+        cached_intent, matcher = self._intent_matcher_cache
+        if matcher is None or cached_intent is not user_intent:
+            matcher = _IntentMatcher(user_intent)
+            self._intent_matcher_cache = (user_intent, matcher)
+        return matcher
+
+    @cached_property
+    def openai_client(self) -> OpenAI:
+        """OpenAI client, created on first use"""
+        return OpenAI(api_key=OPENAI_CONFIG['api_key'])
+
+    @cached_property
+    def kg_connector(self) -> Optional[KnowledgeGraphConnector]:
+        """Knowledge Graph Connector, created on first use if enabled.
+
+        The outcome is cached on the class so later instances don't
+        re-pay connection timeouts when the graph is unreachable.
+        """
+        cls = type(self)
+        if cls._kg_init_cache is None:
+            if not KG_INTEGRATION_CONFIG.get('enabled', False):
+                cls._kg_init_cache = False
+            else:
+                try:
+                    cls._kg_init_cache = KnowledgeGraphConnector()
+                    logger.info("Knowledge Graph Connector initialized successfully")
+                except Exception as e:
+                    logger.warning(f"Failed to initialize Knowledge Graph Connector: {e}")
+                    cls._kg_init_cache = False
+        return cls._kg_init_cache or None
+
     def select_optimal_components(self, retrieved_content: Dict[str, Any],
                                  user_intent: UserIntent) -> Dict[str, Any]:
         """
@@ -117,6 +326,19 @@ class GPTPoweredContentSelector:
         """
         logger.info(f"GPT-5 selecting optimal components for {user_intent.integration_type} integration")
 
+        # Memoize per (query, integration type, retrieved content) so repeated
+        # queries skip the GPT and KG round-trips entirely
+        cache_key = (
+            user_intent.original_query,
+            user_intent.integration_type,
+            tuple(c.get('component_id', '') for c in retrieved_content.get('components') or ()),
+            tuple(a.get('file_name', '') for a in retrieved_content.get('assets') or ())
+        )
+        cached = self._selection_cache.get(cache_key)
+        if cached is not None:
+            logger.info("Returning cached component selection for repeated query")
+            return copy.deepcopy(cached)
+
         try:
             # Use GPT-5 to intelligently analyze and select components
             intelligent_selection = self._gpt_analyze_and_select_components(
@@ -172,6 +394,10 @@ class GPTPoweredContentSelector:
                        f"{len(selected_assets)} assets with confidence: "
                        f"{intelligent_selection.get('confidence_score', 0.8):.2f}")
 
+            if len(self._selection_cache) >= self._SELECTION_CACHE_SIZE:
+                self._selection_cache.pop(next(iter(self._selection_cache)))
+            self._selection_cache[cache_key] = copy.deepcopy(selected_content)
+
             return selected_content
 
         except Exception as e:
@@ -182,126 +408,85 @@ class GPTPoweredContentSelector:
                                           user_intent: UserIntent) -> Dict[str, Any]:
         """Use GPT-5 to intelligently analyze retrieved components and make optimal selections"""
 
-        # Prepare component summaries for GPT analysis
+        # Prepare component summaries for GPT analysis (top 20, no slice copy);
+        # one defaults-merge + itemgetter replaces per-key .get calls
         component_summaries = []
-        for i, component in enumerate(retrieved_content.get('components', [])[:20]):  # Limit to top 20
-            summary = {
+        for i, component in enumerate(islice(retrieved_content.get('components') or (), 20)):
+            comp_id, activity_type, description, properties, bpmn_xml, related_scripts = \
+                _COMP_FIELDS({**_COMP_DEFAULTS, **component})
+            component_summaries.append({
                 'index': i,
-                'id': component.get('component_id', f'comp_{i}'),
-                'activity_type': component.get('activity_type', 'unknown'),
-                'description': component.get('description', '')[:200],  # Truncate for token efficiency
-                'properties': component.get('properties', {}),
-                'has_bpmn_xml': bool(component.get('complete_bpmn_xml')),
-                'related_scripts': len(component.get('related_scripts', []))
-            }
-            component_summaries.append(summary)
+                'id': comp_id or f'comp_{i}',
+                'activity_type': activity_type,
+                'description': _trunc(description or '', 200),  # Truncate for token efficiency
+                'properties': properties,
+                'has_bpmn_xml': bool(bpmn_xml),
+                'related_scripts': len(related_scripts or ())
+            })
 
-        # Prepare asset summaries
+        # Prepare asset summaries (top 15)
         asset_summaries = []
-        for i, asset in enumerate(retrieved_content.get('assets', [])[:15]):  # Limit to top 15
-            summary = {
+        for i, asset in enumerate(islice(retrieved_content.get('assets') or (), 15)):
+            file_name, file_type, description, content = _ASSET_FIELDS({**_ASSET_DEFAULTS, **asset})
+            content = content or ''
+            asset_summaries.append({
                 'index': i,
-                'file_name': asset.get('file_name', f'asset_{i}'),
-                'file_type': asset.get('file_type', 'unknown'),
-                'description': asset.get('description', '')[:150],
-                'has_content': bool(asset.get('content')),
-                'content_preview': asset.get('content', '')[:100] if asset.get('content') else ''
-            }
-            asset_summaries.append(summary)
-
-        analysis_prompt = f"""
-You are an expert SAP Integration Suite architect with deep knowledge of iFlow design patterns and component relationships.
-
-TASK: Analyze the retrieved components and assets, then provide intelligent recommendations for optimal selection and flow design.
-
-USER REQUIREMENTS:
-- Integration Type: {user_intent.integration_type}
-- Source Systems: {user_intent.source_systems}
-- Target Systems: {user_intent.target_systems}
-- Data Types: {user_intent.data_types}
-- Required Operations: {user_intent.business_logic}
-- Original Query: "{user_intent.original_query}"
-
-AVAILABLE COMPONENTS:
-{json.dumps(component_summaries, indent=2)}
-
-AVAILABLE ASSETS:
-{json.dumps(asset_summaries, indent=2)}
-
-Please provide a comprehensive analysis and recommendations in JSON format:
-
-{{
-    "component_recommendations": [
-        {{
-            "component_index": 0,
-            "selection_reason": "Why this component is essential/recommended",
-            "priority": "essential|high|medium|low",
-            "role_in_flow": "What role this component plays",
-            "configuration_notes": "Key configuration considerations"
-        }}
-    ],
-    "asset_recommendations": [
-        {{
-            "asset_index": 0,
-            "selection_reason": "Why this asset is needed",
-            "priority": "essential|high|medium|low",
-            "usage_context": "How this asset will be used"
-        }}
-    ],
-    "flow_design": {{
-        "flow_pattern": "Description of the optimal flow pattern",
-        "component_sequence": ["List of component IDs in execution order"],
-        "connection_logic": {{
-            "linear_connections": [["source_id", "target_id"]],
-            "conditional_connections": [
-                {{
-                    "source_id": "gateway_id",
-                    "conditions": [
-                        {{"condition": "success", "target_id": "next_component"}},
-                        {{"condition": "error", "target_id": "error_handler"}}
-                    ]
-                }}
-            ]
-        }},
-        "error_handling_strategy": "How errors should be handled",
-        "performance_considerations": "Performance optimization notes"
-    }},
-    "selection_reasoning": "Overall reasoning for the selections made",
-    "confidence_score": 0.0-1.0,
-    "integration_completeness": "Assessment of how well the selection meets requirements",
-    "potential_gaps": ["Any missing components or capabilities"],
-    "optimization_suggestions": ["Ways to improve the integration"]
-}}
+                'file_name': file_name or f'asset_{i}',
+                'file_type': file_type,
+                'description': _trunc(description or '', 150),
+                'has_content': bool(content),
+                'content_preview': _trunc(content, 100)
+            })
 
-Focus on:
-1. Selecting components that work well together
-2. Ensuring proper data flow and transformation
-3. Including appropriate error handling
-4. Optimizing for the specific integration pattern
-5. Considering system compatibility and performance
+        analysis_prompt = _ANALYSIS_PROMPT_TMPL.format(
+            integration_type=user_intent.integration_type,
+            source_systems=user_intent.source_systems,
+            target_systems=user_intent.target_systems,
+            data_types=user_intent.data_types,
+            business_logic=user_intent.business_logic,
+            original_query=user_intent.original_query,
+            components_json=orjson.dumps(_to_columns(component_summaries)).decode(),
+            assets_json=orjson.dumps(_to_columns(asset_summaries)).decode()
+        )
 
-Provide only the JSON response, no additional text.
-"""
+        # The prompt is a canonical rendering of intent + candidates, so its
+        # hash keys the analysis cache; identical requests skip the API call
+        analysis_key = hashlib.blake2b(analysis_prompt.encode(), digest_size=16).digest()
+        cached = self._gpt_analysis_cache.get(analysis_key)
+        if cached is not None:
+            logger.info("Reusing cached GPT component analysis")
+            return copy.deepcopy(cached)
 
         try:
-            response = self.openai_client.chat.completions.create(
+            stream = self.openai_client.chat.completions.create(
                 model=OPENAI_CONFIG['component_selection_model'],
                 messages=[
                     {"role": "system", "content": "You are an expert SAP Integration Suite architect. Provide detailed, accurate analysis in JSON format only."},
                     {"role": "user", "content": analysis_prompt}
                 ],
-                max_completion_tokens=3000
+                max_completion_tokens=3000,
+                stream=True
             )
 
-            analysis_text = response.choices[0].message.content.strip()
+            # Accumulate streamed deltas in a list and join once —
+            # repeated str concatenation would be quadratic in response size
+            chunks = []
+            for part in stream:
+                if part.choices and part.choices[0].delta.content:
+                    chunks.append(part.choices[0].delta.content)
+            analysis_text = ''.join(chunks).strip()
 
             # Parse JSON response
             if analysis_text.startswith('```json'):
                 analysis_text = analysis_text.replace('```json', '').replace('```', '').strip()
 
-            analysis = json.loads(analysis_text)
+            analysis = orjson.loads(analysis_text)
             logger.info(f"GPT-5 component analysis completed with confidence: {analysis.get('confidence_score', 'unknown')}")
 
+            if len(self._gpt_analysis_cache) >= self._SELECTION_CACHE_SIZE:
+                self._gpt_analysis_cache.pop(next(iter(self._gpt_analysis_cache)))
+            self._gpt_analysis_cache[analysis_key] = copy.deepcopy(analysis)
+
             return analysis
 
         except json.JSONDecodeError as e:
@@ -319,17 +504,18 @@ Provide only the JSON response, no additional text.
         for rec in recommendations:
             component_index = rec.get('component_index', -1)
             if 0 <= component_index < len(components):
-                component = components[component_index].copy()
-
-                # Enhance component with GPT insights
-                component['gpt_selection_reason'] = rec.get('selection_reason', '')
-                component['gpt_priority'] = rec.get('priority', 'medium')
-                component['gpt_role_in_flow'] = rec.get('role_in_flow', '')
-                component['gpt_config_notes'] = rec.get('configuration_notes', '')
-                component['is_essential'] = rec.get('priority') in ['essential', 'high']
-                component['relevance_score'] = self._priority_to_score(rec.get('priority', 'medium'))
-
-                selected_components.append(component)
+                priority = rec.get('priority', 'medium')
+                # Single merged construction instead of copy-then-assign;
+                # the GPT insights override any stale annotations
+                selected_components.append({
+                    **components[component_index],
+                    'gpt_selection_reason': rec.get('selection_reason', ''),
+                    'gpt_priority': priority,
+                    'gpt_role_in_flow': rec.get('role_in_flow', ''),
+                    'gpt_config_notes': rec.get('configuration_notes', ''),
+                    'is_essential': rec.get('priority') in ['essential', 'high'],
+                    'relevance_score': self._priority_to_score(priority)
+                })
 
         return selected_components
 
@@ -341,47 +527,47 @@ Provide only the JSON response, no additional text.
         for rec in recommendations:
             asset_index = rec.get('asset_index', -1)
             if 0 <= asset_index < len(assets):
-                asset = assets[asset_index].copy()
-
-                # Enhance asset with GPT insights
-                asset['gpt_selection_reason'] = rec.get('selection_reason', '')
-                asset['gpt_priority'] = rec.get('priority', 'medium')
-                asset['gpt_usage_context'] = rec.get('usage_context', '')
-                asset['relevance_score'] = self._priority_to_score(rec.get('priority', 'medium'))
-
-                selected_assets.append(asset)
+                priority = rec.get('priority', 'medium')
+                selected_assets.append({
+                    **assets[asset_index],
+                    'gpt_selection_reason': rec.get('selection_reason', ''),
+                    'gpt_priority': priority,
+                    'gpt_usage_context': rec.get('usage_context', ''),
+                    'relevance_score': self._priority_to_score(priority)
+                })
 
         return selected_assets
 
     def _generate_intelligent_flows(self, components: List[Dict[str, Any]],
                                    flow_design: Dict[str, Any]) -> List[Dict[str, Any]]:
         """Generate intelligent flow connections based on GPT recommendations"""
-        flows = []
+        connection_logic = flow_design.get('connection_logic') or {}
 
         # Linear connections
-        linear_connections = flow_design.get('connection_logic', {}).get('linear_connections', [])
-        for source_id, target_id in linear_connections:
-            flows.append({
+        flows = [
+            {
                 'source_component_id': source_id,
                 'target_component_id': target_id,
                 'flow_type': 'sequence',
                 'connection_logic': 'linear',
                 'gpt_reasoning': 'Sequential flow connection'
-            })
+            }
+            for source_id, target_id in connection_logic.get('linear_connections') or ()
+        ]
 
         # Conditional connections
-        conditional_connections = flow_design.get('connection_logic', {}).get('conditional_connections', [])
-        for conn in conditional_connections:
-            source_id = conn.get('source_id')
-            for condition in conn.get('conditions', []):
-                flows.append({
-                    'source_component_id': source_id,
-                    'target_component_id': condition.get('target_id'),
-                    'flow_type': 'conditional',
-                    'condition': condition.get('condition'),
-                    'connection_logic': 'conditional',
-                    'gpt_reasoning': f"Conditional flow for: {condition.get('condition')}"
-                })
+        flows.extend(
+            {
+                'source_component_id': conn.get('source_id'),
+                'target_component_id': condition.get('target_id'),
+                'flow_type': 'conditional',
+                'condition': condition.get('condition'),
+                'connection_logic': 'conditional',
+                'gpt_reasoning': f"Conditional flow for: {condition.get('condition')}"
+            }
+            for conn in connection_logic.get('conditional_connections') or ()
+            for condition in conn.get('conditions') or ()
+        )
 
         return flows
 
@@ -495,67 +681,83 @@ Provide only the JSON response, no additional text.
     def _score_all_components(self, components: List[Dict[str, Any]], 
                              user_intent: UserIntent) -> List[ComponentScore]:
         """Score all components based on user requirements"""
-        scored_components = []
-        
-        for component in components:
-            score = self._calculate_component_score(component, user_intent)
-            
-            if score.relevance_score > 0.3:  # Only include relevant components
-                scored_components.append(score)
-        
-        # Sort by relevance score
-        scored_components.sort(key=lambda x: x.relevance_score, reverse=True)
-        
+        # Build the per-intent matcher up front so every score reuses it
+        self._get_intent_matcher(user_intent)
+
+        # Bind the scorer once; only survivors of the relevance cut are kept.
+        # Scoring stays serial: the regex and substring scans per component
+        # hold the GIL, so a thread pool adds overhead without parallelism
+        calculate_score = self._calculate_component_score
+        scored_components = [
+            score for component in components
+            if (score := calculate_score(component, user_intent)).relevance_score > 0.3
+        ]
+
+        # Keep only the top candidates, ordered by relevance — O(N log K)
+        # instead of sorting the full candidate list
+        scored_components = heapq.nlargest(self._MAX_SCORED_COMPONENTS,
+                                           scored_components,
+                                           key=attrgetter('relevance_score'))
+
         logger.info(f"Scored {len(scored_components)} relevant components")
         return scored_components
     
     def _calculate_component_score(self, component: Dict[str, Any], 
                                   user_intent: UserIntent) -> ComponentScore:
         """Calculate detailed score for a component"""
-        activity_type = component.get('activity_type', '').lower()
+        # Interning keys set-membership on the small activity-type vocabulary
+        # to a pointer comparison in the selection passes
+        activity_type = sys.intern(component.get('activity_type', '').lower())
         description = component.get('description', '').lower()
         bpmn_xml = component.get('complete_bpmn_xml', '')
-        
+        matcher = self._get_intent_matcher(user_intent)
+
+        # One lowered concatenation of all text fields, shared by the
+        # system-integration and business-logic scorers
+        combined_lc = ' '.join((
+            description, activity_type,
+            str(component.get('properties', {})).lower(),
+            bpmn_xml.lower()
+        ))
+
         # Initialize scoring
         total_score = 0.0
         match_reasons = []
-        
+        w_activity, w_desc, w_xml, w_system, w_logic = self._WEIGHT_VALUES
+
         # 1. Activity type match (40% weight)
-        required_components = getattr(user_intent, 'required_components', []) if hasattr(user_intent, 'required_components') else []
-        activity_score = self._score_activity_type_match(activity_type, required_components)
-        total_score += activity_score * self.component_weights['activity_type_match']
+        activity_score = self._score_activity_type_match(activity_type, matcher.required_components_lc)
+        total_score += activity_score * w_activity
         if activity_score > 0.5:
             match_reasons.append(f"Activity type match: {activity_type}")
-        
+
         # 2. Description relevance (25% weight)
         desc_score = self._score_description_relevance(description, user_intent)
-        total_score += desc_score * self.component_weights['description_relevance']
+        total_score += desc_score * w_desc
         if desc_score > 0.5:
             match_reasons.append("Description relevance")
-        
+
         # 3. BPMN XML quality (15% weight)
         xml_score = self._score_bpmn_xml_quality(bpmn_xml)
-        total_score += xml_score * self.component_weights['bpmn_xml_quality']
+        total_score += xml_score * w_xml
         if xml_score > 0.7:
             match_reasons.append("High-quality BPMN XML")
-        
+
         # 4. System integration relevance (10% weight)
-        system_score = self._score_system_integration(component, user_intent)
-        total_score += system_score * self.component_weights['system_integration']
+        system_score = self._score_system_integration(combined_lc, user_intent)
+        total_score += system_score * w_system
         if system_score > 0.5:
             match_reasons.append("System integration match")
-        
+
         # 5. Business logic match (10% weight)
-        logic_score = self._score_business_logic_match(component, user_intent.business_logic)
-        total_score += logic_score * self.component_weights['business_logic_match']
+        logic_score = self._score_business_logic_match(combined_lc, matcher)
+        total_score += logic_score * w_logic
         if logic_score > 0.5:
             match_reasons.append("Business logic match")
         
         # Determine priority level and essentiality
-        integration_type = getattr(user_intent, 'integration_type', 'sync') if hasattr(user_intent, 'integration_type') else 'sync'
-        required_components = getattr(user_intent, 'required_components', []) if hasattr(user_intent, 'required_components') else []
         priority_level, is_essential = self._determine_component_priority(
-            activity_type, integration_type, required_components
+            activity_type, matcher.integration_type_lc, matcher.required_components_lc
         )
         
         return ComponentScore(
@@ -567,60 +769,55 @@ Provide only the JSON response, no additional text.
             is_essential=is_essential
         )
     
-    def _score_activity_type_match(self, activity_type: str, required_components: List[str]) -> float:
-        """Score how well activity type matches requirements"""
-        if not required_components:
+    def _score_activity_type_match(self, activity_type: str,
+                                   required_components_lc: Tuple[str, ...]) -> float:
+        """Score how well activity type matches requirements (pre-lowered)"""
+        if not required_components_lc:
             return 0.5  # Neutral score if no specific requirements
-        
+
         # Direct match
-        for req_comp in required_components:
-            if req_comp.lower() in activity_type or activity_type in req_comp.lower():
+        for req_comp in required_components_lc:
+            if req_comp in activity_type or activity_type in req_comp:
                 return 1.0
-        
+
         # Partial match
-        activity_keywords = activity_type.split()
-        for keyword in activity_keywords:
-            for req_comp in required_components:
-                if keyword in req_comp.lower() or req_comp.lower() in keyword:
+        for keyword in activity_type.split():
+            for req_comp in required_components_lc:
+                if keyword in req_comp or req_comp in keyword:
                     return 0.7
-        
+
         return 0.2  # Low score for no match
     
     def _score_description_relevance(self, description: str, user_intent: UserIntent) -> float:
         """Score description relevance to user intent"""
         if not description:
             return 0.1
-        
+
+        matcher = self._get_intent_matcher(user_intent)
         score = 0.0
-        
+
         # Check for integration type keywords
-        if user_intent.integration_type.lower() in description:
+        if matcher.integration_type_lc in description:
             score += 0.3
-        
-        # Check for system keywords
-        all_systems = user_intent.source_systems + user_intent.target_systems
-        for system in all_systems:
-            if system.lower() in description:
-                score += 0.2
-                break
-        
+
+        # Check for system keywords (single scan across all systems)
+        if matcher.systems_re and matcher.systems_re.search(description):
+            score += 0.2
+
         # Check for data type keywords
-        for data_type in user_intent.data_types:
-            if data_type.lower() in description:
-                score += 0.2
-                break
-        
-        # Check for business logic keywords
-        for logic in user_intent.business_logic:
-            if logic.lower() in description:
-                score += 0.1
-        
+        if matcher.data_types_re and matcher.data_types_re.search(description):
+            score += 0.2
+
+        # Check for business logic keywords (0.1 per distinct match)
+        if matcher.logic_re:
+            score += 0.1 * len(set(matcher.logic_re.findall(description)))
+
         # Check for general description keywords
-        keyword_matches = sum(1 for keyword in user_intent.description_keywords 
-                             if keyword.lower() in description and len(keyword) > 3)
-        if keyword_matches > 0:
-            score += min(keyword_matches * 0.1, 0.2)
-        
+        if matcher.description_re:
+            keyword_matches = len(set(matcher.description_re.findall(description)))
+            if keyword_matches > 0:
+                score += min(keyword_matches * 0.1, 0.2)
+
         return min(score, 1.0)
     
     def _score_bpmn_xml_quality(self, bpmn_xml: str) -> float:
@@ -629,141 +826,93 @@ Provide only the JSON response, no additional text.
             return 0.0
         
         score = 0.3  # Base score for having XML
-        
-        # Check for essential BPMN elements
-        quality_indicators = [
-            'extensionElements',  # Has configuration
-            'property',          # Has properties
-            'incoming',          # Has connections
-            'outgoing',          # Has connections
-            'BPMNShape',         # Has visual elements
-            'BPMNEdge'           # Has flow connections
-        ]
-        
-        for indicator in quality_indicators:
-            if indicator in bpmn_xml:
-                score += 0.1
-        
+
+        # Check for essential BPMN elements (configuration, properties,
+        # connections and diagram shapes) in a single linear scan
+        score += 0.1 * len(set(_BPMN_QUALITY_RE.findall(bpmn_xml)))
+
         # Bonus for longer, more detailed XML
         if len(bpmn_xml) > 1000:
             score += 0.1
-        
-        return min(score, 1.0)
-    
-    def _score_system_integration(self, component: Dict[str, Any], user_intent: UserIntent) -> float:
-        """Score system integration relevance"""
-        score = 0.0
-        
-        # Check component description and properties for system mentions
-        text_fields = [
-            component.get('description', ''),
-            str(component.get('properties', {})),
-            component.get('complete_bpmn_xml', '')
-        ]
-        
-        combined_text = ' '.join(text_fields).lower()
-        
-        all_systems = user_intent.source_systems + user_intent.target_systems
-        for system in all_systems:
-            if system.lower() in combined_text:
-                score += 0.4
-                break
-        
+
         return min(score, 1.0)
     
-    def _score_business_logic_match(self, component: Dict[str, Any], business_logic: List[str]) -> float:
-        """Score business logic implementation match"""
-        if not business_logic:
+    def _score_system_integration(self, combined_lc: str, user_intent: UserIntent) -> float:
+        """Score system integration relevance against the combined text"""
+        systems_re = self._get_intent_matcher(user_intent).systems_re
+        if systems_re and systems_re.search(combined_lc):
+            return 0.4
+        return 0.0
+
+    def _score_business_logic_match(self, combined_lc: str, matcher: _IntentMatcher) -> float:
+        """Score business logic implementation match against the combined text"""
+        if matcher.logic_re is None:
             return 0.5
-        
-        score = 0.0
-        
-        # Check component for business logic keywords
-        text_fields = [
-            component.get('description', ''),
-            component.get('activity_type', ''),
-            str(component.get('properties', {}))
-        ]
-        
-        combined_text = ' '.join(text_fields).lower()
-        
-        for logic in business_logic:
-            if logic.lower() in combined_text:
-                score += 0.3
-        
+
+        # 0.3 per distinct business-logic keyword present
+        score = 0.3 * len(set(matcher.logic_re.findall(combined_lc)))
         return min(score, 1.0)
     
-    def _determine_component_priority(self, activity_type: str, integration_type: str, 
-                                    required_components: List[str]) -> Tuple[str, bool]:
-        """Determine component priority level and essentiality"""
-        priorities = self.component_priorities.get(integration_type, {})
-        
-        # Check if component is in essential list
-        essential_components = priorities.get('essential', [])
-        for essential in essential_components:
-            if essential.lower() in activity_type or activity_type in essential.lower():
-                return 'high', True
-        
-        # Check if component is in recommended list
-        recommended_components = priorities.get('recommended', [])
-        for recommended in recommended_components:
-            if recommended.lower() in activity_type or activity_type in recommended.lower():
-                return 'medium', False
-        
+    def _determine_component_priority(self, activity_type: str, integration_type: str,
+                                    required_components_lc: Tuple[str, ...]) -> Tuple[int, bool]:
+        """Determine component priority level and essentiality (pre-lowered inputs)"""
+        # Essential and recommended tiers in one precomputed flat scan
+        for keyword, result in self._PRIORITY_INDEX.get(integration_type, ()):
+            if keyword in activity_type or activity_type in keyword:
+                return result
+
         # Check if explicitly required by user
-        for req_comp in required_components:
-            if req_comp.lower() in activity_type or activity_type in req_comp.lower():
-                return 'high', True
-        
-        return 'low', False
+        for req_comp in required_components_lc:
+            if req_comp in activity_type or activity_type in req_comp:
+                return PRIORITY_HIGH, True
+
+        return PRIORITY_LOW, False
 
     def _score_all_assets(self, assets: List[Dict[str, Any]],
                          user_intent: UserIntent) -> List[Dict[str, Any]]:
         """Score all assets based on user requirements"""
-        scored_assets = []
-
-        for asset in assets:
-            score = self._calculate_asset_score(asset, user_intent)
-            if score > 0.3:  # Only include relevant assets
-                scored_assets.append({
-                    **asset,
-                    'relevance_score': score,
-                    'asset_priority': self._get_asset_priority(asset)
-                })
-
-        # Sort by relevance score
-        scored_assets.sort(key=lambda x: x['relevance_score'], reverse=True)
+        calculate_score = self._calculate_asset_score
+        get_priority = self._get_asset_priority
+        scored_assets = [
+            {
+                **asset,
+                'relevance_score': score,
+                'asset_priority': get_priority(asset)
+            }
+            for asset in assets
+            if (score := calculate_score(asset, user_intent)) > 0.3  # Only relevant assets
+        ]
 
-        return scored_assets
+        # Keep only the top assets, ordered by relevance
+        return heapq.nlargest(self._MAX_SCORED_ASSETS, scored_assets,
+                              key=itemgetter('relevance_score'))
 
     def _calculate_asset_score(self, asset: Dict[str, Any], user_intent: UserIntent) -> float:
         """Calculate relevance score for an asset"""
-        file_type = asset.get('file_type', '').lower()
+        file_type = sys.intern(asset.get('file_type', '').lower())
         description = asset.get('description', '').lower()
         content = asset.get('content', '').lower()
 
+        matcher = self._get_intent_matcher(user_intent)
         score = 0.0
 
         # File type priority
-        type_priority = self.asset_priorities.get(file_type, 0.1)
+        type_priority = self._ASSET_PRIORITIES.get(file_type, 0.1)
         score += type_priority
 
-        # Description relevance
-        for keyword in user_intent.asset_keywords:
-            if keyword.lower() in description:
-                score += 0.2
+        # Description relevance (0.2 per distinct keyword hit)
+        if matcher.asset_kw_re:
+            score += 0.2 * len(set(matcher.asset_kw_re.findall(description)))
 
         # Content relevance (for scripts)
-        if file_type == 'groovy':
-            for logic in user_intent.business_logic:
-                if logic.lower() in content:
-                    score += 0.2
+        if file_type == 'groovy' and matcher.logic_re:
+            score += 0.2 * len(set(matcher.logic_re.findall(content)))
 
-        # System integration relevance
-        all_systems = user_intent.source_systems + user_intent.target_systems
-        for system in all_systems:
-            if system.lower() in description or system.lower() in content:
-                score += 0.1
+        # System integration relevance (0.1 per distinct system hit)
+        if matcher.systems_re:
+            matched_systems = set(matcher.systems_re.findall(description))
+            matched_systems.update(matcher.systems_re.findall(content))
+            score += 0.1 * len(matched_systems)
 
         return min(score, 1.0)
 
@@ -786,7 +935,9 @@ Provide only the JSON response, no additional text.
 
         # First, select all essential components
         for comp_score in scored_components:
-            if comp_score.is_essential and len(selected) < 15:
+            if len(selected) >= 15:
+                break
+            if comp_score.is_essential:
                 selected.append({
                     **comp_score.component,
                     'relevance_score': comp_score.relevance_score,
@@ -799,9 +950,10 @@ Provide only the JSON response, no additional text.
 
         # Then, select high-priority components
         for comp_score in scored_components:
-            if (comp_score.priority_level == 'high' and
-                not comp_score.is_essential and
-                len(selected) < 15):
+            if len(selected) >= 15:
+                break
+            if (comp_score.priority_level == PRIORITY_HIGH and
+                not comp_score.is_essential):
 
                 selected.append({
                     **comp_score.component,
@@ -815,9 +967,10 @@ Provide only the JSON response, no additional text.
 
         # Finally, fill with medium-priority components for diversity
         for comp_score in scored_components:
-            if (comp_score.priority_level == 'medium' and
-                comp_score.component_type not in component_types_covered and
-                len(selected) < 12):
+            if len(selected) >= 12:
+                break
+            if (comp_score.priority_level == PRIORITY_MEDIUM and
+                comp_score.component_type not in component_types_covered):
 
                 selected.append({
                     **comp_score.component,
@@ -951,25 +1104,28 @@ Provide only the JSON response, no additional text.
     def _analyze_requirement_coverage(self, selected_components: List[Dict[str, Any]],
                                     user_intent: UserIntent) -> Dict[str, Any]:
         """Analyze how well the selection covers user requirements"""
-        covered_components = set()
-        missing_components = set()
+        covered_components = []
+        missing_components = []
 
-        # Check component coverage
+        # Check component coverage: exact matches are O(1) set hits, the
+        # substring-containment scan is only the fallback
         selected_types = [comp.get('activity_type', '').lower() for comp in selected_components]
+        selected_types_set = set(selected_types)
 
         required_components = getattr(user_intent, 'required_components', []) if hasattr(user_intent, 'required_components') else []
-        for req_comp in required_components:
-            is_covered = any(req_comp.lower() in sel_type or sel_type in req_comp.lower()
-                           for sel_type in selected_types)
-            if is_covered:
-                covered_components.add(req_comp)
-            else:
-                missing_components.add(req_comp)
+        # Dedup once up front; partitioning into lists then needs no set
+        # intermediates or final conversions
+        for req_comp in dict.fromkeys(required_components):
+            req_lc = req_comp.lower()
+            is_covered = (req_lc in selected_types_set or
+                          any(req_lc in sel_type or sel_type in req_lc
+                              for sel_type in selected_types))
+            (covered_components if is_covered else missing_components).append(req_comp)
 
         return {
-            'covered_components': list(covered_components),
-            'missing_components': list(missing_components),
+            'covered_components': covered_components,
+            'missing_components': missing_components,
             'coverage_percentage': len(covered_components) / max(len(required_components), 1) * 100,
             'has_essential_components': any(comp.get('is_essential', False) for comp in selected_components),
-            'component_diversity': len(set(selected_types))
+            'component_diversity': len(selected_types_set)
         }
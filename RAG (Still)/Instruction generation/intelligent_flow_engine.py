@@ -8,7 +8,11 @@ import logging
 import json
 import sys
 import os
+from concurrent.futures import ThreadPoolExecutor
+from types import MappingProxyType
 from typing import Dict, List, Any, Optional
+
+import orjson
 from openai import OpenAI
 
 # Add current directory to path
@@ -18,6 +22,31 @@ from knowledge_graph_connector import KnowledgeGraphConnector
 
 logger = logging.getLogger(__name__)
 
+# Constant tail of the fallback flow design; merged into each fallback
+# result and treated as read-only downstream
+_BASIC_TAIL = MappingProxyType({
+    'error_handling': {
+        'error_paths': [],
+        'global_error_strategy': 'Basic error handling'
+    },
+    'performance_optimization': {
+        'parallel_execution': [],
+        'bottleneck_components': [],
+        'optimization_notes': 'Sequential processing'
+    },
+    'data_flow': {
+        'data_transformations': [],
+        'data_validation_points': []
+    },
+    'integration_completeness': {
+        'requirements_coverage': 'Basic coverage',
+        'missing_elements': ['Advanced error handling'],
+        'enhancement_suggestions': ['Add conditional logic', 'Improve error handling']
+    },
+    'flow_confidence': 0.6,
+    'design_reasoning': 'Fallback sequential flow design'
+})
+
 class IntelligentFlowEngine:
     """
     GPT-5 powered engine for creating intelligent component flows and connections
@@ -29,9 +58,12 @@ class IntelligentFlowEngine:
         
         # Initialize Knowledge Graph Connector if enabled
         self.kg_connector = None
+        self._kg_executor = None
         if KG_INTEGRATION_CONFIG.get('enabled', False):
             try:
                 self.kg_connector = KnowledgeGraphConnector()
+                # Single worker that runs KG analysis while GPT is thinking
+                self._kg_executor = ThreadPoolExecutor(max_workers=1)
                 logger.info("Knowledge Graph Connector initialized for flow optimization")
             except Exception as e:
                 logger.warning(f"Failed to initialize Knowledge Graph Connector: {e}")
@@ -46,22 +78,28 @@ class IntelligentFlowEngine:
         Use GPT-5 to design intelligent component flow and connections
         """
         logger.info(f"Designing intelligent flow for {len(components)} components")
-        
+
+        # Kick off the KG analysis now so it overlaps the GPT round-trip;
+        # it only depends on the components, not on the GPT response
+        kg_future = None
+        if self.kg_connector and KG_INTEGRATION_CONFIG.get('enabled', False):
+            kg_future = self._kg_executor.submit(self._compute_kg_flow_context, components)
+
         try:
             # Prepare component information for GPT analysis
-            component_info = []
-            for i, comp in enumerate(components):
-                info = {
+            component_info = [
+                {
                     'index': i,
                     'id': comp.get('component_id', f'comp_{i}'),
                     'name': comp.get('name', 'Unknown Component'),
                     'type': comp.get('activity_type', 'unknown'),
-                    'description': comp.get('description', '')[:150],
+                    'description': (comp.get('description') or '')[:150],
                     'gpt_role': comp.get('gpt_role_in_flow', ''),
                     'gpt_priority': comp.get('gpt_priority', 'medium'),
                     'is_essential': comp.get('is_essential', False)
                 }
-                component_info.append(info)
+                for i, comp in enumerate(components)
+            ]
             
             # Create GPT prompt for flow design
             flow_design_prompt = f"""
@@ -79,7 +117,7 @@ USER REQUIREMENTS:
 - Original Query: "{user_intent.get('original_query', '')}"
 
 AVAILABLE COMPONENTS:
-{json.dumps(component_info, indent=2)}
+{orjson.dumps(component_info, option=orjson.OPT_INDENT_2).decode()}
 
 EXISTING GPT ANALYSIS:
 Flow Pattern: {gpt_analysis.get('flow_design', {}).get('flow_pattern', 'Not specified')}
@@ -170,12 +208,14 @@ Provide only the JSON response, no additional text.
             if flow_design_text.startswith('```json'):
                 flow_design_text = flow_design_text.replace('```json', '').replace('```', '').strip()
             
-            flow_design = json.loads(flow_design_text)
+            # orjson.JSONDecodeError subclasses json.JSONDecodeError, so the
+            # except clause below still catches parse failures
+            flow_design = orjson.loads(flow_design_text)
             logger.info(f"GPT-5 flow design completed with confidence: {flow_design.get('flow_confidence', 'unknown')}")
             
             # Enhance with Knowledge Graph insights if available
-            if self.kg_connector and KG_INTEGRATION_CONFIG.get('enabled', False):
-                flow_design = self._enhance_flow_with_kg_insights(flow_design, components, user_intent)
+            if kg_future is not None:
+                flow_design = self._enhance_flow_with_kg_insights(flow_design, kg_future)
                 logger.info("Enhanced flow design with Knowledge Graph insights")
             
             return flow_design
@@ -190,118 +230,109 @@ Provide only the JSON response, no additional text.
     def _create_basic_flow_design(self, components: List[Dict[str, Any]], 
                                  user_intent: Dict[str, Any]) -> Dict[str, Any]:
         """Create basic flow design when GPT analysis fails"""
-        
-        # Create simple sequential flow
-        flow_sequence = []
-        connections = []
-        
-        for i, comp in enumerate(components):
-            flow_sequence.append({
+
+        # Create simple sequential flow; component ids are resolved once
+        # and reused for both the steps and the pairwise connections
+        component_ids = [comp.get('component_id', f'comp_{i}')
+                         for i, comp in enumerate(components)]
+
+        flow_sequence = [
+            {
                 'step': i + 1,
-                'component_id': comp.get('component_id', f'comp_{i}'),
+                'component_id': component_ids[i],
                 'component_name': comp.get('name', f'Component {i+1}'),
                 'purpose': 'Process data',
                 'input_requirements': ['Previous step output'],
                 'output_provides': ['Processed data'],
                 'error_scenarios': ['Processing failure']
-            })
-            
-            # Create sequential connections
-            if i > 0:
-                connections.append({
-                    'source_id': components[i-1].get('component_id', f'comp_{i-1}'),
-                    'target_id': comp.get('component_id', f'comp_{i}'),
-                    'connection_type': 'sequence',
-                    'condition': None,
-                    'reasoning': 'Sequential processing'
-                })
-        
+            }
+            for i, comp in enumerate(components)
+        ]
+
+        connections = [
+            {
+                'source_id': source_id,
+                'target_id': target_id,
+                'connection_type': 'sequence',
+                'condition': None,
+                'reasoning': 'Sequential processing'
+            }
+            for source_id, target_id in zip(component_ids, component_ids[1:])
+        ]
+
         return {
             'flow_sequence': flow_sequence,
             'connections': connections,
-            'error_handling': {
-                'error_paths': [],
-                'global_error_strategy': 'Basic error handling'
-            },
-            'performance_optimization': {
-                'parallel_execution': [],
-                'bottleneck_components': [],
-                'optimization_notes': 'Sequential processing'
-            },
-            'data_flow': {
-                'data_transformations': [],
-                'data_validation_points': []
-            },
-            'integration_completeness': {
-                'requirements_coverage': 'Basic coverage',
-                'missing_elements': ['Advanced error handling'],
-                'enhancement_suggestions': ['Add conditional logic', 'Improve error handling']
-            },
-            'flow_confidence': 0.6,
-            'design_reasoning': 'Fallback sequential flow design'
+            **_BASIC_TAIL
         }
     
     def generate_bpmn_structure(self, flow_design: Dict[str, Any], 
                                components: List[Dict[str, Any]]) -> Dict[str, Any]:
         """Generate BPMN structure from intelligent flow design"""
         
-        bpmn_structure = {
+        # Components projected to activities and connections to sequence
+        # flows in single bulk constructions; each selected component is
+        # projected exactly once per request
+        return {
             'start_events': [{'id': 'StartEvent_1', 'name': 'Start'}],
-            'activities': [],
+            'activities': [
+                {
+                    'id': comp.get('component_id', 'unknown'),
+                    'name': comp.get('name', 'Unknown Component'),
+                    'type': comp.get('activity_type', 'serviceTask').lower(),
+                    'properties': comp.get('properties', {}),
+                    'bpmn_xml': comp.get('complete_bpmn_xml', ''),
+                    'description': comp.get('description', ''),
+                    'relevance_score': comp.get('relevance_score', 0.8),
+                    'match_reasons': comp.get('match_reasons', []),
+                    'is_essential': comp.get('is_essential', False),
+                    'gpt_role_in_flow': comp.get('gpt_role_in_flow', ''),
+                    'gpt_selection_reason': comp.get('gpt_selection_reason', '')
+                }
+                for comp in components
+            ],
             'gateways': [],
             'end_events': [{'id': 'EndEvent_1', 'name': 'End'}],
-            'sequence_flows': [],
+            'sequence_flows': [
+                {
+                    'id': f"SequenceFlow_{connection['source_id']}_{connection['target_id']}",
+                    'source_ref': connection['source_id'],
+                    'target_ref': connection['target_id'],
+                    'connection_type': connection.get('connection_type', 'sequence'),
+                    'condition': connection.get('condition'),
+                    'gpt_reasoning': connection.get('reasoning', '')
+                }
+                for connection in flow_design.get('connections') or ()
+            ],
             'total_components': len(components)
         }
-        
-        # Add components as activities
-        for comp in components:
-            activity = {
-                'id': comp.get('component_id', 'unknown'),
-                'name': comp.get('name', 'Unknown Component'),
-                'type': comp.get('activity_type', 'serviceTask').lower(),
-                'properties': comp.get('properties', {}),
-                'bpmn_xml': comp.get('complete_bpmn_xml', ''),
-                'description': comp.get('description', ''),
-                'relevance_score': comp.get('relevance_score', 0.8),
-                'match_reasons': comp.get('match_reasons', []),
-                'is_essential': comp.get('is_essential', False),
-                'gpt_role_in_flow': comp.get('gpt_role_in_flow', ''),
-                'gpt_selection_reason': comp.get('gpt_selection_reason', '')
-            }
-            bpmn_structure['activities'].append(activity)
-        
-        # Add sequence flows from connections
-        for connection in flow_design.get('connections', []):
-            sequence_flow = {
-                'id': f"SequenceFlow_{connection['source_id']}_{connection['target_id']}",
-                'source_ref': connection['source_id'],
-                'target_ref': connection['target_id'],
-                'connection_type': connection.get('connection_type', 'sequence'),
-                'condition': connection.get('condition'),
-                'gpt_reasoning': connection.get('reasoning', '')
-            }
-            bpmn_structure['sequence_flows'].append(sequence_flow)
-        
-        return bpmn_structure
     
-    def _enhance_flow_with_kg_insights(self, flow_design: Dict[str, Any], 
-                                     components: List[Dict[str, Any]], 
-                                     user_intent: Dict[str, Any]) -> Dict[str, Any]:
-        """Enhance flow design with knowledge graph insights"""
+    def _compute_kg_flow_context(self, components: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Run the knowledge graph analysis for a component set; executed on
+        the KG worker thread concurrently with the GPT call"""
+        component_types = [comp.get('activity_type', '') for comp in components]
+
+        kg_optimization = self.kg_connector.generate_flow_optimization(components)
+
+        # Optimal flow paths need start and end components
+        optimal_paths = None
+        if len(component_types) >= 2:
+            optimal_paths = self.kg_connector.find_optimal_flow_path(
+                component_types[0], component_types[-1]
+            )
+
+        return {'optimization': kg_optimization, 'optimal_paths': optimal_paths}
+
+    def _enhance_flow_with_kg_insights(self, flow_design: Dict[str, Any],
+                                     kg_future) -> Dict[str, Any]:
+        """Enhance flow design with the KG context computed in the background;
+        a failed KG analysis leaves the GPT design untouched, as before"""
         try:
-            # Get component types from the flow
-            component_types = [comp.get('activity_type', '') for comp in components]
-            
-            # Get flow optimization from knowledge graph
-            kg_optimization = self.kg_connector.generate_flow_optimization(components)
-            
-            # Get optimal flow paths if we have start and end components
-            if len(component_types) >= 2:
-                start_component = component_types[0]
-                end_component = component_types[-1]
-                optimal_paths = self.kg_connector.find_optimal_flow_path(start_component, end_component)
-                
+            kg_context = kg_future.result()
+            kg_optimization = kg_context['optimization']
+            optimal_paths = kg_context['optimal_paths']
+
+            if optimal_paths is not None:
                 # Add KG insights to flow design
                 flow_design['kg_insights'] = {
                     'optimization_score': kg_optimization['optimization_score'],
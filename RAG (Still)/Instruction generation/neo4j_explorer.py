@@ -7,9 +7,11 @@ Explores the knowledge graph structure to understand component relationships
 import logging
 import sys
 import os
-from neo4j import GraphDatabase
 from typing import Dict, List, Any, Optional
-import json
+
+import orjson
+
+from knowledge_graph_connector import get_driver, close_driver
 
 # Fix Windows console encoding for emojis
 if sys.platform == "win32":
@@ -17,14 +19,6 @@ if sys.platform == "win32":
     sys.stdout = codecs.getwriter("utf-8")(sys.stdout.detach())
     sys.stderr = codecs.getwriter("utf-8")(sys.stderr.detach())
 
-# Neo4j Configuration
-NEO4J_CONFIG = {
-    'uri': 'neo4j+s://a09ee8ee.databases.neo4j.io',
-    'username': 'neo4j',
-    'password': 'X1hAOjlDuAPAMLE3cA7inKb5RQL6JHKeJeV57hKQ_YY',
-    'database': 'neo4j'
-}
-
 logger = logging.getLogger(__name__)
 
 class Neo4jKnowledgeGraphExplorer:
@@ -34,138 +28,151 @@ class Neo4jKnowledgeGraphExplorer:
     
     def __init__(self):
         """Initialize Neo4j connection"""
-        self.driver = GraphDatabase.driver(
-            NEO4J_CONFIG['uri'],
-            auth=(NEO4J_CONFIG['username'], NEO4J_CONFIG['password'])
-        )
+        self.driver = get_driver()
         logger.info("Neo4j Knowledge Graph Explorer initialized")
-    
+
     def close(self):
-        """Close Neo4j connection"""
-        if self.driver:
-            self.driver.close()
+        """Close the shared Neo4j connection"""
+        close_driver()
+        self.driver = None
     
     def explore_graph_structure(self) -> Dict[str, Any]:
         """Explore the overall structure of the knowledge graph"""
         print("🔍 Exploring Knowledge Graph Structure...")
         
+        # Node counts are one UNWIND aggregation across all labels and
+        # relationship counts one type(r) aggregation; the query text is
+        # constant so Neo4j plans each once (the per-label f-string variant
+        # forced a fresh plan per label)
+        count_query = """
+        MATCH (n)
+        UNWIND labels(n) AS label
+        RETURN label, count(*) as count
+        """
+        rel_count_query = """
+        MATCH ()-[r]->()
+        RETURN type(r) as relationship_type, count(*) as count
+        """
+
+        def _run_all(tx):
+            return (tx.run("CALL db.labels()").data(),
+                    tx.run("CALL db.relationshipTypes()").data(),
+                    tx.run(count_query).data(),
+                    tx.run(rel_count_query).data())
+
+        # All four queries share one read transaction instead of paying
+        # begin/commit per query
         with self.driver.session() as session:
-            # Get all node labels
-            node_labels = session.run("CALL db.labels()").data()
-            print(f"📊 Node Labels: {[label['label'] for label in node_labels]}")
-            
-            # Get all relationship types
-            rel_types = session.run("CALL db.relationshipTypes()").data()
-            print(f"🔗 Relationship Types: {[rel['relationshipType'] for rel in rel_types]}")
-            
-            # Get node counts by label
-            node_counts = {}
-            for label in node_labels:
-                count = session.run(f"MATCH (n:{label['label']}) RETURN count(n) as count").single()['count']
-                node_counts[label['label']] = count
-                print(f"   {label['label']}: {count} nodes")
-            
-            # Get relationship counts
-            rel_counts = {}
-            for rel_type in rel_types:
-                count = session.run(f"MATCH ()-[r:{rel_type['relationshipType']}]->() RETURN count(r) as count").single()['count']
-                rel_counts[rel_type['relationshipType']] = count
-                print(f"   {rel_type['relationshipType']}: {count} relationships")
-            
-            return {
-                'node_labels': [label['label'] for label in node_labels],
-                'relationship_types': [rel['relationshipType'] for rel in rel_types],
-                'node_counts': node_counts,
-                'relationship_counts': rel_counts
-            }
+            node_labels, rel_types, count_rows, rel_count_rows = \
+                session.execute_read(_run_all)
+
+        print(f"📊 Node Labels: {[label['label'] for label in node_labels]}")
+        print(f"🔗 Relationship Types: {[rel['relationshipType'] for rel in rel_types]}")
+
+        node_counts = {r['label']: r['count'] for r in count_rows}
+        for label, count in node_counts.items():
+            print(f"   {label}: {count} nodes")
+
+        rel_counts = {r['relationship_type']: r['count'] for r in rel_count_rows}
+        for rel_type, count in rel_counts.items():
+            print(f"   {rel_type}: {count} relationships")
+
+        return {
+            'node_labels': [label['label'] for label in node_labels],
+            'relationship_types': [rel['relationshipType'] for rel in rel_types],
+            'node_counts': node_counts,
+            'relationship_counts': rel_counts
+        }
     
     def explore_component_relationships(self) -> Dict[str, Any]:
         """Explore component-specific relationships and patterns"""
         print("\n🔧 Exploring Component Relationships...")
         
+        # Find component, pattern and system nodes
+        component_query = """
+        MATCH (n)
+        WHERE any(label in labels(n) WHERE label CONTAINS 'Component' OR label CONTAINS 'Activity' OR label CONTAINS 'Flow')
+        RETURN DISTINCT labels(n) as labels, count(n) as count
+        ORDER BY count DESC
+        """
+        pattern_query = """
+        MATCH (n)
+        WHERE any(label in labels(n) WHERE label CONTAINS 'Pattern' OR label CONTAINS 'Integration' OR label CONTAINS 'Flow')
+        RETURN DISTINCT labels(n) as labels, count(n) as count
+        ORDER BY count DESC
+        """
+        system_query = """
+        MATCH (n)
+        WHERE any(label in labels(n) WHERE label CONTAINS 'System' OR label CONTAINS 'SAP' OR label CONTAINS 'SuccessFactors')
+        RETURN DISTINCT labels(n) as labels, count(n) as count
+        ORDER BY count DESC
+        """
+
+        def _run_all(tx):
+            return (tx.run(component_query).data(),
+                    tx.run(pattern_query).data(),
+                    tx.run(system_query).data())
+
         with self.driver.session() as session:
-            # Find component-related nodes
-            component_query = """
-            MATCH (n)
-            WHERE any(label in labels(n) WHERE label CONTAINS 'Component' OR label CONTAINS 'Activity' OR label CONTAINS 'Flow')
-            RETURN DISTINCT labels(n) as labels, count(n) as count
-            ORDER BY count DESC
-            """
-            
-            component_nodes = session.run(component_query).data()
-            print("Component-related nodes:")
-            for node in component_nodes:
-                print(f"   {node['labels']}: {node['count']} nodes")
-            
-            # Find integration patterns
-            pattern_query = """
-            MATCH (n)
-            WHERE any(label in labels(n) WHERE label CONTAINS 'Pattern' OR label CONTAINS 'Integration' OR label CONTAINS 'Flow')
-            RETURN DISTINCT labels(n) as labels, count(n) as count
-            ORDER BY count DESC
-            """
-            
-            pattern_nodes = session.run(pattern_query).data()
-            print("\nIntegration pattern nodes:")
-            for node in pattern_nodes:
-                print(f"   {node['labels']}: {node['count']} nodes")
-            
-            # Find system-related nodes
-            system_query = """
-            MATCH (n)
-            WHERE any(label in labels(n) WHERE label CONTAINS 'System' OR label CONTAINS 'SAP' OR label CONTAINS 'SuccessFactors')
-            RETURN DISTINCT labels(n) as labels, count(n) as count
-            ORDER BY count DESC
-            """
-            
-            system_nodes = session.run(system_query).data()
-            print("\nSystem-related nodes:")
-            for node in system_nodes:
-                print(f"   {node['labels']}: {node['count']} nodes")
-            
-            return {
-                'component_nodes': component_nodes,
-                'pattern_nodes': pattern_nodes,
-                'system_nodes': system_nodes
-            }
+            component_nodes, pattern_nodes, system_nodes = \
+                session.execute_read(_run_all)
+
+        print("Component-related nodes:")
+        for node in component_nodes:
+            print(f"   {node['labels']}: {node['count']} nodes")
+
+        print("\nIntegration pattern nodes:")
+        for node in pattern_nodes:
+            print(f"   {node['labels']}: {node['count']} nodes")
+
+        print("\nSystem-related nodes:")
+        for node in system_nodes:
+            print(f"   {node['labels']}: {node['count']} nodes")
+
+        return {
+            'component_nodes': component_nodes,
+            'pattern_nodes': pattern_nodes,
+            'system_nodes': system_nodes
+        }
     
     def explore_flow_patterns(self) -> Dict[str, Any]:
         """Explore flow patterns and component connections"""
         print("\n🌊 Exploring Flow Patterns...")
         
+        # Find flow relationships; typed patterns let Neo4j scan only the
+        # listed relationship types instead of post-filtering all
+        flow_query = """
+        MATCH (source)-[r:FLOWS_TO|CONNECTS_TO|SEQUENCE|NEXT|FOLLOWS]->(target)
+        RETURN type(r) as relationship_type, count(r) as count
+        ORDER BY count DESC
+        """
+        # Find component sequences; bounding the expansion to the flow
+        # relationship types avoids enumerating every path in the graph
+        # and filtering afterwards
+        sequence_query = """
+        MATCH path = (start)-[:FLOWS_TO|CONNECTS_TO|SEQUENCE|NEXT|FOLLOWS*1..3]->(end)
+        RETURN length(path) as path_length, count(path) as count
+        ORDER BY path_length, count DESC
+        """
+
+        def _run_all(tx):
+            return (tx.run(flow_query).data(), tx.run(sequence_query).data())
+
         with self.driver.session() as session:
-            # Find flow relationships
-            flow_query = """
-            MATCH (source)-[r]->(target)
-            WHERE any(rel_type in ['FLOWS_TO', 'CONNECTS_TO', 'SEQUENCE', 'NEXT', 'FOLLOWS'] 
-                     WHERE type(r) = rel_type)
-            RETURN type(r) as relationship_type, count(r) as count
-            ORDER BY count DESC
-            """
-            
-            flow_relationships = session.run(flow_query).data()
-            print("Flow relationships:")
-            for rel in flow_relationships:
-                print(f"   {rel['relationship_type']}: {rel['count']} relationships")
-            
-            # Find component sequences
-            sequence_query = """
-            MATCH path = (start)-[r*1..3]->(end)
-            WHERE any(rel_type in ['FLOWS_TO', 'CONNECTS_TO', 'SEQUENCE', 'NEXT', 'FOLLOWS'] 
-                     WHERE any(rel in relationships(path) WHERE type(rel) = rel_type))
-            RETURN length(path) as path_length, count(path) as count
-            ORDER BY path_length, count DESC
-            """
-            
-            sequences = session.run(sequence_query).data()
-            print("\nComponent sequences:")
-            for seq in sequences:
-                print(f"   Path length {seq['path_length']}: {seq['count']} sequences")
-            
-            return {
-                'flow_relationships': flow_relationships,
-                'sequences': sequences
-            }
+            flow_relationships, sequences = session.execute_read(_run_all)
+
+        print("Flow relationships:")
+        for rel in flow_relationships:
+            print(f"   {rel['relationship_type']}: {rel['count']} relationships")
+
+        print("\nComponent sequences:")
+        for seq in sequences:
+            print(f"   Path length {seq['path_length']}: {seq['count']} sequences")
+
+        return {
+            'flow_relationships': flow_relationships,
+            'sequences': sequences
+        }
     
     def get_sample_components(self, limit: int = 10) -> List[Dict[str, Any]]:
         """Get sample components with their properties"""
@@ -192,48 +199,55 @@ class Neo4jKnowledgeGraphExplorer:
             
             return components
     
+    def _resolve_matching_labels(self, session, substrings: List[str]) -> List[str]:
+        """Resolve the graph's labels matching any of the given substrings;
+        the label catalogue is tiny, so this is one cheap procedure call"""
+        label_query = """
+        CALL db.labels() YIELD label
+        WHERE any(term IN $terms WHERE label CONTAINS term)
+        RETURN label
+        """
+        return [record['label']
+                for record in session.run(label_query, terms=substrings)]
+
     def find_component_relationships(self, component_type: str = None) -> Dict[str, Any]:
         """Find relationships for specific component types"""
         print(f"\n🔍 Finding Component Relationships for: {component_type or 'All'}")
-        
+
         with self.driver.session() as session:
-            if component_type:
-                # Find relationships for specific component type
-                rel_query = """
-                MATCH (source)-[r]->(target)
-                WHERE any(label in labels(source) WHERE label CONTAINS $component_type)
-                   OR any(label in labels(target) WHERE label CONTAINS $component_type)
-                RETURN 
-                    labels(source) as source_labels,
-                    type(r) as relationship_type,
-                    labels(target) as target_labels,
-                    count(r) as count
-                ORDER BY count DESC
-                LIMIT 20
-                """
-                
-                relationships = session.run(rel_query, component_type=component_type).data()
-            else:
-                # Find all component relationships
-                rel_query = """
-                MATCH (source)-[r]->(target)
-                WHERE any(label in labels(source) WHERE label CONTAINS 'Component' OR label CONTAINS 'Activity')
-                   OR any(label in labels(target) WHERE label CONTAINS 'Component' OR label CONTAINS 'Activity')
-                RETURN 
-                    labels(source) as source_labels,
-                    type(r) as relationship_type,
-                    labels(target) as target_labels,
-                    count(r) as count
-                ORDER BY count DESC
-                LIMIT 20
-                """
-                
-                relationships = session.run(rel_query).data()
-            
+            # Resolve the substring match against the label catalogue first,
+            # then query with literal label predicates: the planner can use
+            # label scans instead of filtering every relationship's labels
+            terms = [component_type] if component_type else ['Component', 'Activity']
+            matched_labels = self._resolve_matching_labels(session, terms)
+
+            if not matched_labels:
+                print("Component relationships:")
+                print("   (no matching labels in graph)")
+                return []
+
+            label_predicate = ' OR '.join(
+                f'source:`{label}` OR target:`{label}`'
+                for label in (l.replace('`', '``') for l in matched_labels)
+            )
+            rel_query = f"""
+            MATCH (source)-[r]->(target)
+            WHERE {label_predicate}
+            RETURN
+                labels(source) as source_labels,
+                type(r) as relationship_type,
+                labels(target) as target_labels,
+                count(r) as count
+            ORDER BY count DESC
+            LIMIT 20
+            """
+
+            relationships = session.run(rel_query).data()
+
             print("Component relationships:")
             for rel in relationships:
                 print(f"   {rel['source_labels']} --[{rel['relationship_type']}]--> {rel['target_labels']} ({rel['count']} times)")
-            
+
             return relationships
     
     def analyze_integration_patterns(self) -> Dict[str, Any]:
@@ -286,9 +300,10 @@ class Neo4jKnowledgeGraphExplorer:
             'patterns': self.analyze_integration_patterns()
         }
         
-        # Save summary to file
-        with open('kg_summary.json', 'w', encoding='utf-8') as f:
-            json.dump(summary, f, indent=2, default=str)
+        # Save summary to file (orjson writes UTF-8 bytes directly;
+        # default=str coerces Neo4j types the encoder doesn't know)
+        with open('kg_summary.json', 'wb') as f:
+            f.write(orjson.dumps(summary, option=orjson.OPT_INDENT_2, default=str))
         
         print("✅ Knowledge Graph summary saved to kg_summary.json")
         return summary
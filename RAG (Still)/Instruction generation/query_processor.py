@@ -2,10 +2,14 @@
 Intelligent Query Processing with GPT-4 Analysis
 Uses GPT-4 for deep understanding of user requirements and intelligent component analysis
 """
+import copy
+import hashlib
 import logging
 import re
 import json
 from typing import Dict, List, Any, Optional
+
+import orjson
 from openai import OpenAI
 from config import (
     OPENAI_CONFIG, SYSTEM_KEYWORDS, DATA_TYPE_KEYWORDS,
@@ -14,17 +18,89 @@ from config import (
 
 logger = logging.getLogger(__name__)
 
+# Strips leading/trailing markdown code fences from LLM responses
+_JSON_FENCE_RE = re.compile(r'^```(?:json)?\s*|\s*```$')
+
+def _compile_keyword_patterns(keyword_map: Dict[str, List[str]]) -> Dict[str, re.Pattern]:
+    """Compile one alternation regex per category so each query is scanned
+    once per category instead of once per keyword; longest keywords first so
+    nested alternatives still match their longest form"""
+    return {
+        key: re.compile('|'.join(map(re.escape, sorted(keywords, key=len, reverse=True))))
+        for key, keywords in keyword_map.items()
+    }
+
+_SYSTEM_PATTERNS = _compile_keyword_patterns(SYSTEM_KEYWORDS)
+_DATA_TYPE_PATTERNS = _compile_keyword_patterns(DATA_TYPE_KEYWORDS)
+_OPERATION_PATTERNS = _compile_keyword_patterns(OPERATION_KEYWORDS)
+_INTEGRATION_PATTERN_RES = _compile_keyword_patterns(
+    {pattern: config['keywords'] for pattern, config in INTEGRATION_PATTERNS.items()}
+)
+
+# Single alternation over every configured keyword, for keyword extraction
+_ALL_KEYWORDS_RE = re.compile('|'.join(map(re.escape, sorted(
+    {keyword
+     for keywords in (*SYSTEM_KEYWORDS.values(), *DATA_TYPE_KEYWORDS.values(),
+                      *OPERATION_KEYWORDS.values())
+     for keyword in keywords},
+    key=len, reverse=True))))
+
 class IntelligentQueryProcessor:
     """
     Intelligent query processor using GPT-4 for deep understanding
     Analyzes user requirements and provides intelligent component recommendations
     """
 
+    # Maximum number of memoized query analyses kept per instance
+    _QUERY_CACHE_SIZE = 128
+
+    # Maximum number of memoized query embeddings kept per instance
+    _EMBEDDING_CACHE_SIZE = 1024
+
+    # OpenAI accepts at most this many inputs per embeddings request
+    _EMBEDDING_BATCH_LIMIT = 2048
+
     def __init__(self):
         """Initialize OpenAI client for both analysis and embeddings"""
         self.openai_client = OpenAI(api_key=OPENAI_CONFIG['api_key'])
+        self._query_cache = {}
+        self._embedding_cache = {}
+        self._embedding_cache_hits = 0
+        self._embedding_cache_misses = 0
         logger.info("IntelligentQueryProcessor initialized with GPT-4 analysis capabilities")
-    
+
+    def _query_cache_key(self, user_query: str) -> bytes:
+        """Content hash over the normalized query and analysis model, so
+        reworded whitespace/case variants of a query hit the same entry"""
+        key_text = f"{self._normalize_query(user_query)}|{OPENAI_CONFIG['analysis_model']}"
+        return hashlib.blake2b(key_text.encode(), digest_size=16).digest()
+
+    def _embedding_cache_key(self, query: str) -> bytes:
+        """Content hash over the normalized query and embedding model"""
+        key_text = f"{self._normalize_query(query)}|{OPENAI_CONFIG['embedding_model']}"
+        return hashlib.blake2b(key_text.encode(), digest_size=16).digest()
+
+    def _store_embedding(self, cache_key: bytes, embedding: List[float]):
+        """Store an embedding, evicting the oldest entry once full"""
+        if len(self._embedding_cache) >= self._EMBEDDING_CACHE_SIZE:
+            self._embedding_cache.pop(next(iter(self._embedding_cache)))
+        self._embedding_cache[cache_key] = list(embedding)
+
+    def warmup_embedding_cache(self, queries: List[str]):
+        """Precompute embeddings for common queries so the first real
+        requests already hit the cache"""
+        self.generate_query_embeddings_batch(queries)
+
+    def embedding_cache_stats(self) -> Dict[str, Any]:
+        """Report embedding cache hit/miss counters for observability"""
+        total = self._embedding_cache_hits + self._embedding_cache_misses
+        return {
+            'hits': self._embedding_cache_hits,
+            'misses': self._embedding_cache_misses,
+            'hit_rate': self._embedding_cache_hits / total if total else 0.0,
+            'size': len(self._embedding_cache)
+        }
+
     def process_query_intelligently(self, user_query: str) -> Dict[str, Any]:
         """
         Intelligently process user query using GPT-4 for deep understanding
@@ -37,6 +113,13 @@ class IntelligentQueryProcessor:
         """
         logger.info(f"Intelligently processing query: {user_query[:100]}...")
 
+        # Repeated queries skip both network calls entirely
+        cache_key = self._query_cache_key(user_query)
+        cached = self._query_cache.get(cache_key)
+        if cached is not None:
+            logger.info("Returning cached query analysis")
+            return copy.deepcopy(cached)
+
         try:
             # Step 1: GPT-4 powered deep analysis of user requirements
             intelligent_analysis = self._analyze_requirements_with_gpt(user_query)
@@ -50,7 +133,7 @@ class IntelligentQueryProcessor:
             # Step 4: Generate component selection criteria
             component_criteria = self._generate_component_criteria(intelligent_analysis)
 
-            return {
+            result = {
                 'original_query': user_query,
                 'intelligent_analysis': intelligent_analysis,
                 'embedding': embedding,
@@ -63,6 +146,15 @@ class IntelligentQueryProcessor:
                 }
             }
 
+            # Only cache complete results: a zero-vector embedding means the
+            # embeddings call failed and should be retried on the next ask
+            if any(embedding):
+                if len(self._query_cache) >= self._QUERY_CACHE_SIZE:
+                    self._query_cache.pop(next(iter(self._query_cache)))
+                self._query_cache[cache_key] = copy.deepcopy(result)
+
+            return result
+
         except Exception as e:
             logger.error(f"Error in intelligent query processing: {e}")
             return self._create_fallback_analysis(user_query)
@@ -132,11 +224,12 @@ Provide only the JSON response, no additional text.
 
             analysis_text = response.choices[0].message.content.strip()
 
-            # Parse JSON response
-            if analysis_text.startswith('```json'):
-                analysis_text = analysis_text.replace('```json', '').replace('```', '').strip()
+            # Parse JSON response; orjson.JSONDecodeError subclasses
+            # json.JSONDecodeError, so the except clause below still catches
+            if analysis_text.startswith('```'):
+                analysis_text = _JSON_FENCE_RE.sub('', analysis_text)
 
-            analysis = json.loads(analysis_text)
+            analysis = orjson.loads(analysis_text)
             logger.info(f"GPT-5 analysis completed with confidence: {analysis.get('confidence_level', 'unknown')}")
 
             return analysis
@@ -150,35 +243,37 @@ Provide only the JSON response, no additional text.
 
     def _extract_intelligent_search_terms(self, analysis: Dict[str, Any]) -> Dict[str, List[str]]:
         """Extract intelligent search terms from GPT analysis"""
+        # Collected as sets so repeated terms (shared purpose words across
+        # components, overlapping system lists) dedup as they arrive
         search_terms = {
-            'component_terms': [],
-            'system_terms': [],
-            'operation_terms': [],
-            'data_terms': [],
-            'technical_terms': []
+            'component_terms': set(),
+            'system_terms': set(),
+            'operation_terms': set(),
+            'data_terms': set(),
+            'technical_terms': set()
         }
 
         # Extract from recommended components
         for component in analysis.get('recommended_components', []):
-            search_terms['component_terms'].append(component.get('component_type', '').lower())
-            search_terms['operation_terms'].extend(component.get('purpose', '').lower().split())
+            search_terms['component_terms'].add(component.get('component_type', '').lower())
+            search_terms['operation_terms'].update(component.get('purpose', '').lower().split())
 
         # Extract system terms
-        search_terms['system_terms'].extend(analysis.get('source_systems', []))
-        search_terms['system_terms'].extend(analysis.get('target_systems', []))
+        search_terms['system_terms'].update(analysis.get('source_systems', []))
+        search_terms['system_terms'].update(analysis.get('target_systems', []))
 
         # Extract data terms
-        search_terms['data_terms'].extend(analysis.get('data_entities', []))
+        search_terms['data_terms'].update(analysis.get('data_entities', []))
 
         # Extract operation terms
-        search_terms['operation_terms'].extend(analysis.get('required_operations', []))
+        search_terms['operation_terms'].update(analysis.get('required_operations', []))
 
         # Extract technical terms
         tech_reqs = analysis.get('technical_requirements', {})
         for req_type, requirements in tech_reqs.items():
-            search_terms['technical_terms'].extend(requirements)
+            search_terms['technical_terms'].update(requirements)
 
-        return search_terms
+        return {category: list(terms) for category, terms in search_terms.items()}
 
     def _generate_component_criteria(self, analysis: Dict[str, Any]) -> Dict[str, Any]:
         """Generate intelligent component selection criteria"""
@@ -280,21 +375,86 @@ Provide only the JSON response, no additional text.
         Returns:
             1536-dimensional embedding vector
         """
+        # Repeated or reworded queries return the cached vector directly
+        cache_key = self._embedding_cache_key(query)
+        cached = self._embedding_cache.get(cache_key)
+        if cached is not None:
+            self._embedding_cache_hits += 1
+            return list(cached)
+        self._embedding_cache_misses += 1
+
         try:
             response = self.openai_client.embeddings.create(
                 model=OPENAI_CONFIG['embedding_model'],
                 input=query,
                 dimensions=OPENAI_CONFIG['embedding_dimensions']
             )
-            
+
             embedding = response.data[0].embedding
+            self._store_embedding(cache_key, embedding)
             logger.debug(f"Generated embedding with {len(embedding)} dimensions")
             return embedding
-            
+
         except Exception as e:
+            # The zero-vector fallback is deliberately not cached so a
+            # later retry of the same query can still succeed
             logger.error(f"Error generating embedding: {e}")
             return [0.0] * OPENAI_CONFIG['embedding_dimensions']
-    
+
+    def generate_query_embeddings_batch(self, queries: List[str]) -> List[List[float]]:
+        """
+        Generate embeddings for several texts in as few API calls as possible
+
+        Cache hits are served locally; the remaining texts (deduplicated on
+        their normalized content) are sent together, one request per batch of
+        up to 2048 inputs, and the fresh vectors are spliced back into the
+        original order.
+
+        Args:
+            queries: Texts to embed
+
+        Returns:
+            One 1536-dimensional embedding vector per input, in input order
+        """
+        embeddings: List[Optional[List[float]]] = [None] * len(queries)
+
+        # Positions of cache misses, grouped by content key so duplicate
+        # inputs only cost one request slot
+        miss_positions: Dict[bytes, List[int]] = {}
+        for i, query in enumerate(queries):
+            cache_key = self._embedding_cache_key(query)
+            cached = self._embedding_cache.get(cache_key)
+            if cached is not None:
+                self._embedding_cache_hits += 1
+                embeddings[i] = list(cached)
+            else:
+                self._embedding_cache_misses += 1
+                miss_positions.setdefault(cache_key, []).append(i)
+
+        miss_keys = list(miss_positions)
+        for start in range(0, len(miss_keys), self._EMBEDDING_BATCH_LIMIT):
+            batch_keys = miss_keys[start:start + self._EMBEDDING_BATCH_LIMIT]
+            try:
+                response = self.openai_client.embeddings.create(
+                    model=OPENAI_CONFIG['embedding_model'],
+                    input=[queries[miss_positions[key][0]] for key in batch_keys],
+                    dimensions=OPENAI_CONFIG['embedding_dimensions']
+                )
+                for cache_key, item in zip(batch_keys, response.data):
+                    self._store_embedding(cache_key, item.embedding)
+                    for position in miss_positions[cache_key]:
+                        embeddings[position] = list(item.embedding)
+
+            except Exception as e:
+                # As with single calls, failed batches fall back to zero
+                # vectors and stay uncached so a retry can succeed
+                logger.error(f"Error generating batch embeddings: {e}")
+                for cache_key in batch_keys:
+                    for position in miss_positions[cache_key]:
+                        embeddings[position] = [0.0] * OPENAI_CONFIG['embedding_dimensions']
+
+        return embeddings
+
     def _normalize_query(self, query: str) -> str:
         """
         Normalize query text for better processing
@@ -364,12 +524,12 @@ Provide only the JSON response, no additional text.
         Identify the main operation type from query
         """
         operation_scores = {}
-        
-        for op_type, keywords in OPERATION_KEYWORDS.items():
-            score = sum(1 for keyword in keywords if keyword in query)
+
+        for op_type, pattern in _OPERATION_PATTERNS.items():
+            score = len(set(pattern.findall(query)))
             if score > 0:
                 operation_scores[op_type] = score
-        
+
         if operation_scores:
             return max(operation_scores, key=operation_scores.get)
         
@@ -379,22 +539,17 @@ Provide only the JSON response, no additional text.
         """
         Identify systems mentioned in the query
         """
-        identified_systems = []
-        
-        for system, keywords in SYSTEM_KEYWORDS.items():
-            if any(keyword in query for keyword in keywords):
-                identified_systems.append(system)
-        
-        return identified_systems
+        return [system for system, pattern in _SYSTEM_PATTERNS.items()
+                if pattern.search(query)]
     
     def _identify_data_type(self, query: str) -> Optional[str]:
         """
         Identify the data type being processed
         """
         data_type_scores = {}
-        
-        for data_type, keywords in DATA_TYPE_KEYWORDS.items():
-            score = sum(1 for keyword in keywords if keyword in query)
+
+        for data_type, pattern in _DATA_TYPE_PATTERNS.items():
+            score = len(set(pattern.findall(query)))
             if score > 0:
                 data_type_scores[data_type] = score
         
@@ -408,11 +563,11 @@ Provide only the JSON response, no additional text.
         Identify the integration pattern from query
         """
         pattern_scores = {}
-        
-        for pattern, config in INTEGRATION_PATTERNS.items():
-            score = sum(1 for keyword in config['keywords'] if keyword in query)
+
+        for pattern_name, pattern in _INTEGRATION_PATTERN_RES.items():
+            score = len(set(pattern.findall(query)))
             if score > 0:
-                pattern_scores[pattern] = score
+                pattern_scores[pattern_name] = score
         
         if pattern_scores:
             return max(pattern_scores, key=pattern_scores.get)
@@ -423,40 +578,15 @@ Provide only the JSON response, no additional text.
         """
         Identify all operations mentioned in the query
         """
-        operations = []
-        
-        for op_type, keywords in OPERATION_KEYWORDS.items():
-            if any(keyword in query for keyword in keywords):
-                operations.append(op_type)
-        
-        return operations
+        return [op_type for op_type, pattern in _OPERATION_PATTERNS.items()
+                if pattern.search(query)]
     
     def _extract_keywords(self, query: str) -> List[str]:
         """
         Extract relevant keywords for hybrid search
         """
-        keywords = []
-        
-        # Extract system keywords
-        for system, system_keywords in SYSTEM_KEYWORDS.items():
-            for keyword in system_keywords:
-                if keyword in query:
-                    keywords.append(keyword)
-        
-        # Extract data type keywords
-        for data_type, type_keywords in DATA_TYPE_KEYWORDS.items():
-            for keyword in type_keywords:
-                if keyword in query:
-                    keywords.append(keyword)
-        
-        # Extract operation keywords
-        for op_type, op_keywords in OPERATION_KEYWORDS.items():
-            for keyword in op_keywords:
-                if keyword in query:
-                    keywords.append(keyword)
-        
-        # Remove duplicates and return
-        return list(set(keywords))
+        # One scan over the query matches every configured keyword at once
+        return list(set(_ALL_KEYWORDS_RE.findall(query)))
     
     def _calculate_confidence(self, intent: Dict[str, Any]) -> float:
         """
@@ -16,7 +16,7 @@ from config import SUPABASE_CONFIG, VECTOR_SEARCH_CONFIG
 
 logger = logging.getLogger(__name__)
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class UserIntent:
     """User intent structure"""
     integration_type: str